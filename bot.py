@@ -4,33 +4,70 @@ import os
 from logging import getLogger
 
 from asqlite import create_pool
-from discord import Intents
 from discord.ext import commands
 
 from lib import Client, DiscordTranslator, Translator
+from lib.db import SqliteProfile
+from lib.gateway import GatewayProfile
+from lib.http_interactions import InteractionServer
+from lib.metrics import serve_metrics
 
 logger = getLogger(__name__)
 
 
 class Bot(commands.Bot):
     def __init__(self):
-        intents = Intents.default()
-        intents.typing = False
-        super().__init__(command_prefix=commands.when_mentioned_or('/'), intents=intents)
+        super().__init__(command_prefix=commands.when_mentioned_or('/'), **GatewayProfile.from_env().options())
 
         self.commit_hash = os.environ['COMMIT_HASH']
+        self.http_interactions = False
 
     async def setup_hook(self):
-        self.api_client = Client(self)
+        # workers serving HTTP interactions share user settings through the database only.
+        self.api_client = Client(self, cache_user_info=not self.http_interactions)
         async with self.api_client.db() as db:
             await db.create_table()
+        await self.api_client.start()
 
         await self.tree.set_translator(DiscordTranslator())
         await self.add_cog(Translator(self, self.api_client))
-        commands = await self.tree.sync()
-        logger.info(f'synced commands are: {", ".join(cmd.mention for cmd in commands)}')
+        if os.getenv('SYNC_COMMANDS', '1') == '1':
+            commands = await self.tree.sync()
+            logger.info(f'synced commands are: {", ".join(cmd.mention for cmd in commands)}')
+
+    async def close(self):
+        if hasattr(self, 'api_client'):
+            await self.api_client.close()
+        await super().close()
 
     async def runner(self):
-        async with self, create_pool(os.getenv('DATABASE_PATH', './db/db.sqlite3')) as pool:
+        metrics_port = os.getenv('METRICS_PORT')
+        # the pool is closed last, pending user updates are written while the bot closes.
+        async with (
+            create_pool(os.getenv('DATABASE_PATH', './db/db.sqlite3'), init=SqliteProfile.from_env().apply) as pool,
+            self,
+            serve_metrics(os.getenv('METRICS_HOST', '127.0.0.1'), int(metrics_port) if metrics_port else None),
+        ):
             self.pool = pool
             await self.start(token=os.environ['DISCORD_TOKEN'])
+
+    async def serve_interactions(self, port: int):
+        """Receive interactions over HTTP instead of the gateway. Only logs in to use the REST API.
+
+        User settings are not cached, so that a setting made through one worker is seen by the others at once.
+        """
+        self.http_interactions = True
+        metrics_port = os.getenv('METRICS_PORT')
+        server = InteractionServer(
+            self,
+            os.environ['DISCORD_PUBLIC_KEY'],
+            response_timeout=float(os.getenv('INTERACTIONS_RESPONSE_TIMEOUT', '2.5')),
+        )
+        async with (
+            create_pool(os.getenv('DATABASE_PATH', './db/db.sqlite3'), init=SqliteProfile.from_env().apply) as pool,
+            self,
+            serve_metrics(os.getenv('METRICS_HOST', '127.0.0.1'), int(metrics_port) if metrics_port else None),
+        ):
+            self.pool = pool
+            await self.login(os.environ['DISCORD_TOKEN'])
+            await server.serve(os.getenv('INTERACTIONS_HOST', '127.0.0.1'), port)
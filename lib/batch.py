@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# DeepL accepts up to 50 texts and 128 KiB of request body per /v2/translate call.
+MAX_TEXTS = 50
+MAX_BYTES = 120 * 1024
+
+
+def plan_batches(texts: Sequence[str], max_texts: int = MAX_TEXTS, max_bytes: int = MAX_BYTES) -> list[slice]:
+    """Pack texts into consecutive batches bounded by text count and encoded size.
+
+    Batches keep the original order, so the translations of each batch can be concatenated as is.
+    A text larger than max_bytes is sent alone.
+    """
+    batches: list[slice] = []
+    start = size = 0
+    for i, text in enumerate(texts):
+        length = len(text.encode('utf-8'))
+        if i > start and (i - start >= max_texts or size + length > max_bytes):
+            batches.append(slice(start, i))
+            start, size = i, 0
+        size += length
+    if start < len(texts):
+        batches.append(slice(start, len(texts)))
+    return batches
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+
+    from .db import DBClient
+    from .locale import LocaleString
+
+logger = getLogger(__name__)
+
+
+class LRUCache[K, V]:
+    """In-memory LRU cache. Entries older than ``ttl`` seconds are treated as missing."""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: K) -> V | None:
+        entry = self.data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.data[key]
+            self.misses += 1
+            return None
+
+        self.data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        self.data[key] = (time.monotonic() + self.ttl, value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self.data.pop(key, None)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+
+def segment_hash(text: str) -> str:
+    return blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class TranslationCache:
+    """Two tier (memory and SQLite) cache of translated segments keyed by (segment hash, target locale)."""
+
+    def __init__(
+        self,
+        db: Callable[..., DBClient],
+        *,
+        memory_size: int,
+        persistent_size: int,
+        ttl: float,
+        eviction_interval: float = 60.0,
+    ) -> None:
+        self.db = db
+        self.memory: LRUCache[tuple[str, LocaleString], str] = LRUCache(memory_size, ttl)
+        self.persistent_size = persistent_size
+        self.ttl = ttl
+        self.eviction_interval = eviction_interval
+        self.last_eviction = 0.0
+
+    async def get_many(self, texts: Sequence[str], target_locale: LocaleString) -> list[str | None]:
+        hashes = [segment_hash(text) for text in texts]
+        result = [self.memory.get((h, target_locale)) for h in hashes]
+        missing = [h for h, r in zip(hashes, result) if r is None]
+        if not missing:
+            return result
+
+        async with self.db(readonly=True) as db:
+            found = await db.get_cached_translations(target_locale, missing, time.time() - self.ttl)
+        for i, h in enumerate(hashes):
+            if result[i] is None and h in found:
+                result[i] = found[h]
+                self.memory.set((h, target_locale), found[h])
+
+        return result
+
+    async def put_many(self, pairs: Iterable[tuple[str, str]], target_locale: LocaleString) -> None:
+        now = time.time()
+        rows: list[tuple[str, str]] = []
+        for text, translated in pairs:
+            h = segment_hash(text)
+            self.memory.set((h, target_locale), translated)
+            rows.append((h, translated))
+        if not rows:
+            return
+
+        async with self.db() as db:
+            await db.put_cached_translations(target_locale, rows, now)
+            if now - self.last_eviction >= self.eviction_interval:
+                self.last_eviction = now
+                await db.evict_cached_translations(now - self.ttl, self.persistent_size)
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import time
 from logging import getLogger
 from sys import version
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from aiohttp import ClientSession, __version__ as aiohttp_version
+from aiohttp import ClientError, ClientSession, ClientTimeout, __version__ as aiohttp_version
 from discord import Locale
 from discord.app_commands import locale_str
 
-from .db import DBClient, is_free_user
-from .locale import LocaleString, discord_locale_into_deepl_locale
+from .batch import plan_batches
+from .cache import LRUCache, TranslationCache
+from .db import DBClient, UserField, UserInfo, is_free_user
+from .langdetect import is_in_locale
+from .locale import LocaleString, choice_label, discord_locale_into_deepl_locale
 from .localization import (
     MSG_403,
     MSG_429,
@@ -18,19 +24,45 @@ from .localization import (
     MSG_NEED_KEY,
     MSG_NEED_KEY_AND_LOCALE,
     MSG_NEED_LOCALE,
+    MSG_NOTHING_TO_TRANSLATE,
     MSG_UNKNOWN_STATUS,
     MSG_USAGE_CHARACTER_COUNT,
     MSG_USAGE_DOCUMENT_COUNT,
     MSG_USAGE_TEAM_DOCUMENT_COUNT,
 )
-from .string_pair import StringPair
+from .metrics import (
+    CACHE_HIT_RATE,
+    CACHE_SIZE,
+    COALESCED,
+    CONNECTIONS,
+    DEEPL_ERRORS,
+    DEEPL_REQUEST_SECONDS,
+    DEEPL_RESPONSES,
+    FETCH_USAGE_SECONDS,
+    POOL_IDLE,
+    SAVED_CHARACTERS,
+    TRANSLATE_SECONDS,
+    TRANSLATED_CHARACTERS,
+)
+from .placeholder import billed_length, protect, restore
+from .quota import UsageTracker
+from .retry import KeyBackoff, RetryPolicy, is_retryable
+from .singleflight import SingleFlight
+from .string_pair import MessageData, StringPair, deduplicate
+from .tracing import Tracer, span
+from .transport import TransportStats, create_connector, encode_json_body
+from .write_behind import UserWriteBehind
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
     from bot import Bot
 
-    from .string_pair import MessageData
+    from .string_pair import SegmentPath, UniqueSegments
 
 USER_AGENT = f'discord translation bot (repo:https://github.com/hawk-tomy/translation-bot.git python:{version} aiohttp:{aiohttp_version})'
+# lower bound of the timeout of a DeepL request attempt made close to the retry deadline.
+MIN_ATTEMPT_SECONDS = 1
 logger = getLogger(__name__)
 
 
@@ -41,27 +73,168 @@ class UnexpectedCondition(Exception):
         self.msg = message
 
 
+def heading(locale: LocaleString, target_locales: tuple[LocaleString, ...]) -> str:
+    """Line put before the translation into locale, when there are several."""
+    return f'**{choice_label[locale]}**' if len(target_locales) > 1 else ''
+
+
 class Client:
-    def __init__(self, bot: Bot) -> None:
+    def __init__(self, bot: Bot, *, cache_user_info: bool = True) -> None:
         self.bot = bot
         self.pool = bot.pool
+        # without it user settings are read from and written to the database at once, for workers sharing it.
+        self.cache_user_info = cache_user_info
+
+        self.transport_stats = TransportStats()
+        self.keepalive_timeout = float(os.getenv('DEEPL_KEEPALIVE_TIMEOUT', '60'))
+        self.gzip_min_bytes = int(os.getenv('DEEPL_GZIP_MIN_BYTES', '16384'))
+        self.warm_up_timeout = float(os.getenv('DEEPL_WARM_UP_TIMEOUT', '5'))
+        self.connector = create_connector(
+            limit=int(os.getenv('DEEPL_CONNECTION_LIMIT', '32')),
+            limit_per_host=int(os.getenv('DEEPL_CONNECTION_LIMIT_PER_HOST', '16')),
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self.free_api_session = self.create_session(os.getenv('DEEPL_FREE_API_URL', 'https://api-free.deepl.com'))
+        self.pro_api_session = self.create_session(os.getenv('DEEPL_API_URL', 'https://api.deepl.com'))
+        self.keep_warm_task: asyncio.Task[None] | None = None
+
+        self.translation_cache = TranslationCache(
+            self.db,
+            memory_size=int(os.getenv('TRANSLATION_CACHE_SIZE', '2048')),
+            persistent_size=int(os.getenv('TRANSLATION_CACHE_DB_SIZE', '100000')),
+            ttl=float(os.getenv('TRANSLATION_CACHE_TTL', '86400')),
+        )
+        self.user_info_cache: LRUCache[int, UserInfo] = LRUCache(
+            max_size=int(os.getenv('USER_INFO_CACHE_SIZE', '4096')),
+            ttl=float(os.getenv('USER_INFO_CACHE_TTL', '600')),
+        )
+        self.user_writes = UserWriteBehind(
+            self.db,
+            delay=float(os.getenv('USER_WRITE_DELAY', '0.5')),
+            max_batch=int(os.getenv('USER_WRITE_BATCH', '256')),
+        )
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv('DEEPL_RETRY_MAX_ATTEMPTS', '4')),
+            deadline=float(os.getenv('DEEPL_RETRY_DEADLINE', '10')),
+            attempt_timeout=float(os.getenv('DEEPL_ATTEMPT_TIMEOUT', '5')),
+        )
+        self.backoff = KeyBackoff(self.retry_policy)
+        self.usage = UsageTracker(ttl=float(os.getenv('DEEPL_USAGE_TTL', '300')))
+        self.usage_flight: SingleFlight[str, dict[str, Any]] = SingleFlight()
+        self.background_tasks: set[asyncio.Task[Any]] = set()
+        self.deduplicated_characters = 0
+        self.protect_placeholders = os.getenv('DEEPL_PROTECT_PLACEHOLDERS', '1') == '1'
+        self.protected_characters = 0
+        self.skip_same_language = os.getenv('DEEPL_SKIP_SAME_LANGUAGE', '1') == '1'
+        self.same_language_characters = 0
+        self.max_parallel_requests = int(os.getenv('DEEPL_MAX_PARALLEL_REQUESTS', '4'))
+        self.translate_flight: SingleFlight[tuple[LocaleString, tuple[str, ...], str | None], list[str]] = (
+            SingleFlight()
+        )
+        self.tracer = Tracer(
+            sample_rate=float(os.getenv('TRACE_SAMPLE_RATE', '1')),
+            slow_seconds=float(os.getenv('TRACE_SLOW_SECONDS', '3')),
+        )
+        self.register_metrics()
+
+    def register_metrics(self) -> None:
+        CACHE_SIZE.set_function(lambda: len(self.translation_cache.memory), cache='translation')
+        CACHE_HIT_RATE.set_function(lambda: self.translation_cache.memory.hit_rate, cache='translation')
+        CACHE_SIZE.set_function(lambda: len(self.user_info_cache), cache='user_info')
+        CACHE_HIT_RATE.set_function(lambda: self.user_info_cache.hit_rate, cache='user_info')
+        # asqlite exposes no count of idle connections, its pool keeps them in this queue.
+        POOL_IDLE.set_function(lambda: self.pool._queue.qsize())
+        CONNECTIONS.set_function(lambda: self.transport_stats.created, kind='created')
+        CONNECTIONS.set_function(lambda: self.transport_stats.reused, kind='reused')
+        COALESCED.set_function(lambda: self.translate_flight.coalesced)
+
+    def create_session(self, base_url: str) -> ClientSession:
+        return ClientSession(
+            base_url=base_url,
+            headers={'User-Agent': USER_AGENT},
+            connector=self.connector,
+            connector_owner=False,
+            trace_configs=[self.transport_stats.trace_config()],
+        )
+
+    async def start(self) -> None:
+        await self.warm_up()
+        self.keep_warm_task = asyncio.create_task(self.keep_warm())
+
+    async def close(self) -> None:
+        try:
+            await self.user_writes.close()
+        except Exception:
+            logger.exception('failed to write pending user updates')
+        if self.keep_warm_task is not None:
+            self.keep_warm_task.cancel()
+        for task in self.background_tasks:
+            task.cancel()
+        await self.free_api_session.close()
+        await self.pro_api_session.close()
+        await self.connector.close()
+
+    async def warm_up(self) -> None:
+        """Open (or keep) a connection to each DeepL host so that a translation does not pay for DNS and TLS.
+
+        Best effort: an unreachable host is given up after warm_up_timeout, so that it does not hold up startup.
+        """
 
-        self.free_api_session = ClientSession(base_url='https://api-free.deepl.com', headers={'User-Agent': USER_AGENT})
-        self.pro_api_session = ClientSession(base_url='https://api.deepl.com', headers={'User-Agent': USER_AGENT})
+        async def warm(session: ClientSession) -> None:
+            try:
+                async with asyncio.timeout(self.warm_up_timeout), session.head('/') as resp:
+                    await resp.read()
+            except Exception:
+                logger.debug(f'failed to warm up connection to {session._base_url}', exc_info=True)
 
-    def db(self) -> DBClient:
-        return DBClient(self.bot, self.pool.acquire())
+        await asyncio.gather(warm(self.free_api_session), warm(self.pro_api_session))
+
+    async def keep_warm(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_timeout / 2)
+            await self.warm_up()
+
+    def db(self, *, readonly: bool = False) -> DBClient:
+        return DBClient(self.bot, self.pool.acquire(), readonly=readonly)
+
+    async def get_user_info(self, user_id: int) -> UserInfo:
+        if not self.cache_user_info:
+            async with self.db(readonly=True) as db:
+                return await db.get_user_info(user_id)
+        if (user_info := self.user_info_cache.get(user_id)) is None:
+            generation = self.user_writes.flushes
+            async with self.db(readonly=True) as db:
+                user_info = await db.get_user_info(user_id)
+            # do not cache a row read while an update was pending or written, it may be stale.
+            if generation == self.user_writes.flushes and user_id not in self.user_writes:
+                self.user_info_cache.set(user_id, user_info)
+        return self.user_writes.apply(user_info)
+
+    async def update_user_field(self, user_id: int, field: UserField, value: str | None) -> None:
+        await self.update_user_fields(user_id, {field: value})
+
+    async def update_user_fields(self, user_id: int, fields: dict[UserField, str | None]) -> None:
+        """Update columns of a user. The update is visible at once and written to the database shortly after.
+
+        Written at once if user info is not cached.
+        """
+        if not self.cache_user_info:
+            async with self.db() as db:
+                await db.update_users(tuple(fields), [(user_id, *fields.values())])
+            return
+        if (cached := self.user_info_cache.get(user_id)) is not None:
+            self.user_info_cache.set(user_id, cached.updated(fields))
+        self.user_writes.put(user_id, fields)
 
     async def detect_user_locale(self, user_id: int, discord_locale: Locale) -> LocaleString | None:
         """Detect user's target locale from database or discord locale. This value is used as default value for locale selection.
 
         DO NOT USE THIS VALUE FOR TRANSLATION. RETURNED LOCALE MAYBE MISMATCHED WITH USER'S ACTUAL TARGET LOCALE.
         """
-        async with self.db() as db:
-            user_info = await db.get_user_info(user_id)
-            if user_info.target_locale is None:
-                return discord_locale_into_deepl_locale(discord_locale)
-            return user_info.target_locale
+        user_info = await self.get_user_info(user_id)
+        if not (target_locales := user_info.target_locales):
+            return discord_locale_into_deepl_locale(discord_locale)
+        return target_locales[0]
 
     def process_status(self, status: int):
         match status:
@@ -78,42 +251,266 @@ class Client:
             case _:  # Unknown status
                 raise UnexpectedCondition(MSG_UNKNOWN_STATUS)
 
-    async def translate(self, user_id: int, pair: StringPair) -> list[MessageData]:
-        async with self.db() as db:
-            user_info = await db.get_user_info(user_id)
-            if user_info.is_empty():
-                raise UnexpectedCondition(MSG_NEED_KEY_AND_LOCALE)
-            if user_info.key is None:
-                raise UnexpectedCondition(MSG_NEED_KEY)
-            if user_info.target_locale is None:
-                raise UnexpectedCondition(MSG_NEED_LOCALE)
+    async def user_key_and_locales(self, user_id: int) -> tuple[str, tuple[LocaleString, ...]]:
+        """Key and target locales of a user who can translate."""
+        with span('get_user_info'):
+            user_info = await self.get_user_info(user_id)
+        if user_info.is_empty():
+            raise UnexpectedCondition(MSG_NEED_KEY_AND_LOCALE)
+        if user_info.key is None:
+            raise UnexpectedCondition(MSG_NEED_KEY)
+        if not (target_locales := user_info.target_locales):
+            raise UnexpectedCondition(MSG_NEED_LOCALE)
+        return user_info.key, target_locales
+
+    async def translate_stream(self, user_id: int, pair: StringPair) -> AsyncGenerator[MessageData, Any]:
+        """Messages of the translated content, then of the embeds, for each target locale of the user in turn.
+
+        All of them are translated at once, and each is yielded as soon as it and those before it are ready. An error
+        raised after some messages were yielded only fails the rest.
+        """
+        key, target_locales = await self.user_key_and_locales(user_id)
+        start = time.perf_counter()
+        # the message is encoded once for all locales.
+        with span('encode'):
+            content_segments, embed_segments = deduplicate(pair.encode_content()), deduplicate(pair.encode_embeds())
+        tasks = [
+            (
+                asyncio.create_task(self.translate_segments(key, locale, content_segments)),
+                asyncio.create_task(self.translate_segments(key, locale, embed_segments)),
+            )
+            for locale in target_locales
+        ]
+        everything = asyncio.gather(*(task for locale_tasks in tasks for task in locale_tasks), return_exceptions=True)
+        everything.add_done_callback(lambda _: TRANSLATE_SECONDS.observe(time.perf_counter() - start))
+        try:
+            for locale, (content, embeds) in zip(target_locales, tasks, strict=True):
+                title = heading(locale, target_locales)
+                translated = await content
+                with span('decode'):
+                    content_messages = pair.decode_content(translated, title)
+                for message in content_messages:
+                    yield message
+                translated = await embeds
+                with span('decode'):
+                    embed_messages = pair.decode_embeds(translated, '' if content_messages else title)
+                if not content_messages and not embed_messages:
+                    # the same for every locale, so nothing has been yielded yet.
+                    raise UnexpectedCondition(MSG_NOTHING_TO_TRANSLATE)
+                for message in embed_messages:
+                    yield message
+        finally:
+            # nothing more is wanted if a translation failed or the consumer stopped.
+            for content, embeds in tasks:
+                content.cancel()
+                embeds.cancel()
+
+    async def translate_segments(
+        self, key: str, target_locale: LocaleString, unique: UniqueSegments
+    ) -> list[tuple[SegmentPath, str]]:
+        if not unique.texts:
+            return []
+        if unique.saved_characters:
+            self.deduplicated_characters += unique.saved_characters
+            SAVED_CHARACTERS.inc(unique.saved_characters, reason='duplicate')
+            logger.debug(f'deduplicated {unique.saved_characters} characters')
+
+        same = [False] * len(unique.texts)
+        if self.skip_same_language:
+            # texts already in the target language are kept as they are.
+            with span('detect'):
+                same = [is_in_locale(text, target_locale) for text in unique.texts]
+            if same_characters := sum(len(text) for text, s in zip(unique.texts, same) if s):
+                self.same_language_characters += same_characters
+                SAVED_CHARACTERS.inc(same_characters, reason='same_language')
+                logger.debug(f'skipped {same_characters} characters already in {target_locale}')
+
+        results = iter(
+            await self.translate_unique(key, target_locale, [text for text, s in zip(unique.texts, same) if not s])
+        )
+        translated = [text if s else next(results) for text, s in zip(unique.texts, same)]
+        return [(path, translated[i]) for path, i in zip(unique.paths, unique.indexes)]
+
+    async def translate_unique(self, key: str, target_locale: LocaleString, texts: list[str]) -> list[str]:
+        if not texts:
+            return []
+        if not self.protect_placeholders:
+            return await self.translate_texts(key, texts, target_locale)
+
+        with span('protect'):
+            protected = [protect(text) for text in texts]
+        protected_characters = sum(sum(map(len, p.spans)) for p in protected)
+        self.protected_characters += protected_characters
+        SAVED_CHARACTERS.inc(protected_characters, reason='protected')
+        results = iter(await self.translate_texts(key, [p.text for p in protected if p.translatable], target_locale))
+        with span('restore'):
+            return [restore(next(results), p.spans) if p.translatable else text for text, p in zip(texts, protected)]
+
+    async def translate_texts(self, key: str, texts: list[str], target_locale: LocaleString) -> list[str]:
+        if not texts:
+            return []
+        with span('cache.get'):
+            cached = await self.translation_cache.get_many(texts, target_locale)
+        misses = [text for text, t in zip(texts, cached) if t is None]
+        results: list[str] = []
+        if misses:
+            with span('translate_misses'):
+                results = await self.translate_misses(key, misses, target_locale)
+
+        it = iter(results)
+        return [t if t is not None else next(it) for t in cached]
+
+    async def translate_misses(self, key: str, texts: list[str], target_locale: LocaleString) -> list[str]:
+        led = False
+
+        async def call() -> list[str]:
+            nonlocal led
+            led = True
+            results = await self.request_translate(key, texts, target_locale)
+            with span('cache.put'):
+                await self.translation_cache.put_many(zip(texts, results), target_locale)
+            return results
+
+        try:
+            return await self.translate_flight.do((target_locale, tuple(texts), None), call)
+        except UnexpectedCondition as e:
+            # the shared call was made with another user's key. errors bound to that key are not ours.
+            if led or e.msg not in (MSG_403, MSG_456):
+                raise
+        return await self.translate_flight.do((target_locale, tuple(texts), key), call)
+
+    async def request(self, key: str, method: str, path: str, *, body: Any = None) -> Any:
+        """Call DeepL API with key. 429, 5xx and timeouts are retried with backoff until the retry deadline.
+
+        Network errors are raised as UnexpectedCondition like a 5xx, so callers only handle that.
+        """
+        session = self.free_api_session if is_free_user(key) else self.pro_api_session
+        headers = {'Authorization': f'DeepL-Auth-Key {key}'}
+        data = None
+        if body is not None:
+            data, content_headers = encode_json_body(body, self.gzip_min_bytes)
+            headers.update(content_headers)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.retry_policy.deadline
+        attempt = 0
+        while True:
+            with span('deepl.backoff'):
+                if not await self.backoff.wait(key, deadline):
+                    raise UnexpectedCondition(MSG_429)
+
+            attempt += 1
+            start = time.perf_counter()
+            try:
+                # an attempt may not outlive the deadline, including reading the body.
+                remaining = max(deadline - loop.time(), MIN_ATTEMPT_SECONDS)
+                timeout = ClientTimeout(total=min(self.retry_policy.attempt_timeout, remaining))
+                with span(f'deepl {method} {path}'):
+                    resp = await session.request(method, path, headers=headers, data=data, timeout=timeout)
+            except TimeoutError as e:
+                DEEPL_ERRORS.inc(path=path, error=type(e).__name__)
+                # a stalled attempt is retried like a 5xx while the deadline allows.
+                retry_at = self.backoff.failed(key, None)
+                if attempt >= self.retry_policy.max_attempts or retry_at > deadline:
+                    raise UnexpectedCondition(MSG_500_OR_MORE) from e
+                logger.info(f'DeepL timed out on {method} {path}, retrying (attempt {attempt})')
+                continue
+            except ClientError as e:
+                DEEPL_ERRORS.inc(path=path, error=type(e).__name__)
+                raise UnexpectedCondition(MSG_500_OR_MORE) from e
+            DEEPL_REQUEST_SECONDS.observe(time.perf_counter() - start, path=path)
+            DEEPL_RESPONSES.inc(path=path, status=str(resp.status))
+            async with resp:
+                if resp.status == 200:
+                    self.backoff.succeeded(key)
+                    try:
+                        with span('deepl.read'):
+                            return await resp.json()
+                    except (ClientError, TimeoutError) as e:
+                        DEEPL_ERRORS.inc(path=path, error=type(e).__name__)
+                        raise UnexpectedCondition(MSG_500_OR_MORE) from e
+                if resp.status == 456:
+                    self.usage.exhausted(key)
+                if not is_retryable(resp.status):
+                    self.process_status(resp.status)
+
+                retry_at = self.backoff.failed(key, resp.headers.get('Retry-After'))
+                if attempt >= self.retry_policy.max_attempts or retry_at > deadline:
+                    self.process_status(resp.status)
+                logger.info(f'DeepL responded {resp.status} to {method} {path}, retrying (attempt {attempt})')
+
+    def billed_characters(self, texts: list[str]) -> int:
+        """Characters DeepL counts against the quota for texts, which are protected when placeholders are."""
+        return sum(map(billed_length if self.protect_placeholders else len, texts))
+
+    async def request_translate(self, key: str, texts: list[str], target_locale: LocaleString) -> list[str]:
+        if not self.usage.is_fresh(self.usage.get(key)):
+            self.refresh_usage_soon(key)
+        if not self.usage.allows(key, self.billed_characters(texts)):
+            raise UnexpectedCondition(MSG_456)
+
+        batches = plan_batches(texts)
+        if len(batches) == 1:
+            return await self.request_translate_batch(key, texts, target_locale)
+
+        semaphore = asyncio.Semaphore(self.max_parallel_requests)
+
+        async def run(batch: slice) -> list[str]:
+            async with semaphore:
+                return await self.request_translate_batch(key, texts[batch], target_locale)
+
+        tasks = [asyncio.create_task(run(batch)) for batch in batches]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return [text for result in results for text in result]
+
+    async def request_translate_batch(self, key: str, texts: list[str], target_locale: LocaleString) -> list[str]:
+        body: dict[str, Any] = {'text': texts, 'target_lang': target_locale}
+        if self.protect_placeholders:
+            # keep splitting sentences on newlines as in plain text mode.
+            body |= {'tag_handling': 'xml', 'split_sentences': '1'}
+        json = await self.request(key, 'POST', '/v2/translate', body=body)
+        characters = self.billed_characters(texts)
+        self.usage.add(key, characters)
+        TRANSLATED_CHARACTERS.inc(characters)
+        return [v['text'] for v in json['translations']]
+
+    async def get_usage(self, key: str) -> dict[str, Any]:
+        """Usage of key, served from the local record while it is fresh."""
+        record = self.usage.get(key)
+        if record is not None and self.usage.is_fresh(record):
+            return record.data
+        return await self.usage_flight.do(key, lambda: self.refresh_usage(key))
 
-        k, v = zip(*pair.encode())
-        session = self.free_api_session if is_free_user(user_info.key) else self.pro_api_session
+    async def refresh_usage(self, key: str) -> dict[str, Any]:
+        json = await self.request(key, 'GET', '/v2/usage')
+        self.usage.set(key, json)
+        return json
 
-        async with session.post(
-            '/v2/translate',
-            headers={'Authorization': f'DeepL-Auth-Key {user_info.key}'},
-            params={'text': v, 'target_lang': user_info.target_locale},
-        ) as resp:
-            self.process_status(resp.status)
-            json = await resp.json()
+    def refresh_usage_soon(self, key: str) -> None:
+        if key in self.usage_flight.calls:
+            return
+        task = asyncio.create_task(self.usage_flight.do(key, lambda: self.refresh_usage(key)))
+        self.background_tasks.add(task)
+        task.add_done_callback(self.refresh_usage_done)
 
-        return pair.decode(tuple(zip(k, (v['text'] for v in json['translations']))))
+    def refresh_usage_done(self, task: asyncio.Task[Any]) -> None:
+        self.background_tasks.discard(task)
+        # nobody waits for a background refresh, the next get_usage tries again.
+        if not task.cancelled() and (e := task.exception()) is not None:
+            logger.debug('failed to refresh usage in the background', exc_info=e)
 
     async def fetch_usage(self, user_id: int) -> list[tuple[locale_str, str]]:
-        async with self.db() as db:
-            user_info = await db.get_user_info(user_id)
+        with FETCH_USAGE_SECONDS.time():
+            with span('get_user_info'):
+                user_info = await self.get_user_info(user_id)
             if user_info.key is None:
                 raise UnexpectedCondition(MSG_NEED_KEY)
 
-        session = self.free_api_session if is_free_user(user_info.key) else self.pro_api_session
-        async with session.get(
-            '/v2/usage',
-            headers={'Authorization': f'DeepL-Auth-Key {user_info.key}'},
-        ) as res:
-            self.process_status(res.status)
-            json = await res.json()
+            with span('get_usage'):
+                json = await self.get_usage(user_info.key)
 
         return [
             (name, f'{json[f"{key}_count"]}/{json[f"{key}_limit"]}')
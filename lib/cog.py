@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from contextlib import aclosing
 from logging import getLogger
 from typing import TYPE_CHECKING
 
@@ -13,10 +14,12 @@ from .localization import (
     MSG_COMMAND_NAME_TRANSLATE,
     MSG_COMMAND_NAME_USAGE,
     MSG_USAGE_EMBED_TITLE,
-    translate as translate_static,
+    render,
 )
+from .metrics import DISCORD_SEND_SECONDS
 from .setting import Setting
 from .string_pair import MessageData, StringPair
+from .tracing import span
 
 if TYPE_CHECKING:
     from bot import Bot
@@ -47,39 +50,56 @@ class Translator(commands.Cog):
         @allowed_contexts(guilds=True, dms=True, private_channels=True)
         @allowed_installs(guilds=False, users=True)
         async def translate(interaction: Interaction, message: Message):
-            await interaction.response.defer(ephemeral=True)
-            user_id = interaction.user.id
-            ephemeral = not interaction.context.dm_channel
+            with self.api_client.tracer.trace('translate', interaction_id=interaction.id, user_id=interaction.user.id):
+                await self.translate_message(interaction, message)
 
-            try:
-                msgs = await self.api_client.translate(user_id, StringPair(message))
-            except UnexpectedCondition as e:
-                await interaction.followup.send(content=await translate_static(interaction, e.msg), ephemeral=ephemeral)
-                return
+        return translate
 
-            for msg in msgs:
-                await interaction.followup.send(content=msg.content or '', embeds=msg.embeds, ephemeral=ephemeral)
+    async def translate_message(self, interaction: Interaction, message: Message) -> None:
+        with span('defer'):
+            await interaction.response.defer(ephemeral=True)
+        user_id = interaction.user.id
+        ephemeral = not interaction.context.dm_channel
 
-        return translate
+        # content is sent as soon as it is translated, embeds follow. an error is sent after what was delivered.
+        try:
+            async with aclosing(self.api_client.translate_stream(user_id, StringPair(message))) as msgs:
+                async for msg in msgs:
+                    with DISCORD_SEND_SECONDS.time(), span('followup.send'):
+                        await interaction.followup.send(
+                            content=msg.content or '', embeds=msg.embeds, ephemeral=ephemeral
+                        )
+        except UnexpectedCondition as e:
+            with span('followup.send'):
+                await interaction.followup.send(content=render(interaction, e.msg)[0], ephemeral=ephemeral)
 
     @command(name=MSG_COMMAND_NAME_USAGE, description=MSG_COMMAND_DESCRIPTION_USAGE)
     @allowed_contexts(guilds=True, dms=True, private_channels=True)
     @allowed_installs(guilds=False, users=True)
     async def usage(self, interaction: Interaction):
         """show amount of usage."""
-        await interaction.response.defer(ephemeral=True)
+        with self.api_client.tracer.trace('usage', interaction_id=interaction.id, user_id=interaction.user.id):
+            await self.show_usage(interaction)
+
+    async def show_usage(self, interaction: Interaction) -> None:
+        with span('defer'):
+            await interaction.response.defer(ephemeral=True)
         ephemeral = not interaction.context.dm_channel
         user_id = interaction.user.id
 
         try:
-            data = await self.api_client.fetch_usage(user_id)
+            with span('fetch_usage'):
+                data = await self.api_client.fetch_usage(user_id)
         except UnexpectedCondition as e:
-            await interaction.followup.send(content=await translate_static(interaction, e.msg), ephemeral=ephemeral)
+            with span('followup.send'):
+                await interaction.followup.send(content=render(interaction, e.msg)[0], ephemeral=ephemeral)
             return
 
-        embed = Embed(title=await translate_static(interaction, MSG_USAGE_EMBED_TITLE), colour=Colour.blue())
-        for name, value in data:
+        title, *names = render(interaction, MSG_USAGE_EMBED_TITLE, *(name for name, _ in data))
+        embed = Embed(title=title, colour=Colour.blue())
+        for name, (_, value) in zip(names, data):
             embed.add_field(name=name, value=value)
-        await interaction.followup.send(embeds=[embed], ephemeral=ephemeral)
+        with DISCORD_SEND_SECONDS.time(), span('followup.send'):
+            await interaction.followup.send(embeds=[embed], ephemeral=ephemeral)
 
     setting = Setting()
@@ -1,56 +1,173 @@
 from __future__ import annotations
 
+import os
 from types import TracebackType
-from typing import TYPE_CHECKING, NamedTuple, Self
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Self
 
 from asqlite import _AcquireProxyContextManager
 
-from .locale import LocaleString
+from .locale import LocaleString, parse_locales
+from .metrics import DB_ACQUIRE_SECONDS, DB_QUERY_SECONDS
+from .tracing import span
 
 if TYPE_CHECKING:
+    import sqlite3
+    from collections.abc import Mapping, Sequence
+
     from bot import Bot
 
+# SQLite limits the number of host parameters in one statement.
+MAX_PARAMS = 500
+
+type UserField = Literal['key', 'target_locale']  # type: ignore[valid-type]
+
+
+class SqliteProfile(NamedTuple):
+    """Pragmas applied to each pooled connection. asqlite already sets journal_mode=WAL and autocommit."""
+
+    synchronous: str = 'NORMAL'  # WAL stays consistent with NORMAL, only the last commits may roll back on power loss.
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -16 * 1024  # negative is KiB
+    busy_timeout: int = 5000  # ms
+
+    @classmethod
+    def from_env(cls) -> SqliteProfile:
+        return cls(
+            synchronous=os.getenv('SQLITE_SYNCHRONOUS', cls._field_defaults['synchronous']),
+            mmap_size=int(os.getenv('SQLITE_MMAP_SIZE', cls._field_defaults['mmap_size'])),
+            cache_size=int(os.getenv('SQLITE_CACHE_SIZE', cls._field_defaults['cache_size'])),
+            busy_timeout=int(os.getenv('SQLITE_BUSY_TIMEOUT', cls._field_defaults['busy_timeout'])),
+        )
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        """Usable as the init of asqlite.create_pool."""
+        for name, value in self._asdict().items():
+            conn.execute(f'PRAGMA {name} = {value}')
+
 
 class UserInfo(NamedTuple):
     user_id: int
     key: str | None
-    target_locale: LocaleString | None
+    # comma separated target locales, see target_locales.
+    target_locale: str | None
 
     def is_empty(self) -> bool:
         return self.key is None and self.target_locale is None
 
+    def updated(self, fields: Mapping[UserField, str | None]) -> UserInfo:
+        """This user info with fields replaced."""
+        return self._replace(
+            key=fields.get('key', self.key), target_locale=fields.get('target_locale', self.target_locale)
+        )
+
+    @property
+    def target_locales(self) -> tuple[LocaleString, ...]:
+        return parse_locales(self.target_locale)
+
 
 def is_free_user(key: str) -> bool:
     return key.endswith(':fx')
 
 
 class DBClient:
-    def __init__(self, bot: Bot, ctx: _AcquireProxyContextManager):
+    """A pooled connection. Read-write sessions run in one transaction, read-only sessions run in autocommit."""
+
+    def __init__(self, bot: Bot, ctx: _AcquireProxyContextManager, *, readonly: bool = False):
         self.ctx = ctx
+        self.readonly = readonly
 
     async def __aenter__(self) -> Self:
-        self.conn = await self.ctx.__aenter__()
+        with DB_ACQUIRE_SECONDS.time(), span('db.acquire'):
+            self.conn = await self.ctx.__aenter__()
+        if not self.readonly:
+            try:
+                # take the write lock now, a deferred transaction could not upgrade to write while another one writes.
+                await self.conn.execute('BEGIN IMMEDIATE')
+            except BaseException as e:
+                await self.ctx.__aexit__(type(e), e, e.__traceback__)
+                raise
         return self
 
     async def __aexit__(self, et: type[BaseException] | None, ev: BaseException | None, eb: TracebackType | None):
-        await self.conn.commit()
+        if not self.readonly:
+            try:
+                with span('db.commit'):
+                    await self.conn.execute('COMMIT' if et is None else 'ROLLBACK')
+            except BaseException as e:
+                await self.ctx.__aexit__(type(e), e, e.__traceback__)
+                raise
         return await self.ctx.__aexit__(et, ev, eb)
 
     async def create_table(self):
         await self.conn.execute(
             'CREATE TABLE IF NOT EXISTS user (user_id INT PRIMARY KEY, key TEXT, target_locale TEXT)'
         )
+        await self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS translation_cache ('
+            'hash TEXT, target_locale TEXT, translated TEXT, created_at REAL, PRIMARY KEY (hash, target_locale))'
+        )
+        await self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS translation_cache_created_at ON translation_cache (created_at)'
+        )
 
     async def get_user_info(self, user_id: int) -> UserInfo:
-        async with self.conn.execute('SELECT key, target_locale FROM user WHERE user_id = ?', (user_id,)) as cur:
-            rows = await cur.fetchone()
-            if rows:
-                return UserInfo(user_id, rows[0], rows[1])
+        with DB_QUERY_SECONDS.time(query='get_user_info'), span('db.get_user_info'):
+            async with self.conn.execute('SELECT key, target_locale FROM user WHERE user_id = ?', (user_id,)) as cur:
+                rows = await cur.fetchone()
+        if rows:
+            return UserInfo(user_id, rows[0], rows[1])
 
         return UserInfo(user_id, None, None)
 
     async def update_user_info(self, user_info: UserInfo) -> None:
-        await self.conn.execute(
-            'REPLACE INTO user (user_id, key, target_locale) VALUES (?, ?, ?)',
-            (user_info.user_id, user_info.key, user_info.target_locale),
-        )
+        with DB_QUERY_SECONDS.time(query='update_user_info'), span('db.update_user_info'):
+            await self.conn.execute(
+                'REPLACE INTO user (user_id, key, target_locale) VALUES (?, ?, ?)',
+                (user_info.user_id, user_info.key, user_info.target_locale),
+            )
+
+    async def update_user_field(self, user_id: int, field: UserField, value: str | None) -> None:
+        await self.update_users((field,), [(user_id, value)])
+
+    async def update_users(self, fields: tuple[UserField, ...], rows: Sequence[tuple[Any, ...]]) -> None:
+        """Upsert fields of users. Each row is (user_id, *values of fields)."""
+        with DB_QUERY_SECONDS.time(query='update_users'), span('db.update_users'):
+            await self.conn.executemany(
+                f'INSERT INTO user (user_id, {", ".join(fields)}) VALUES (?{", ?" * len(fields)}) '
+                f'ON CONFLICT (user_id) DO UPDATE SET {", ".join(f"{f} = excluded.{f}" for f in fields)}',
+                rows,
+            )
+
+    async def get_cached_translations(
+        self, target_locale: LocaleString, hashes: Sequence[str], created_after: float
+    ) -> dict[str, str]:
+        found: dict[str, str] = {}
+        with DB_QUERY_SECONDS.time(query='get_cached_translations'), span('db.get_cached_translations'):
+            for i in range(0, len(hashes), MAX_PARAMS):
+                chunk = hashes[i : i + MAX_PARAMS]
+                async with self.conn.execute(
+                    'SELECT hash, translated FROM translation_cache '
+                    f'WHERE target_locale = ? AND created_at > ? AND hash IN ({", ".join("?" * len(chunk))})',
+                    (target_locale, created_after, *chunk),
+                ) as cur:
+                    for row in await cur.fetchall():
+                        found[row[0]] = row[1]
+        return found
+
+    async def put_cached_translations(
+        self, target_locale: LocaleString, rows: Sequence[tuple[str, str]], created_at: float
+    ) -> None:
+        with DB_QUERY_SECONDS.time(query='put_cached_translations'), span('db.put_cached_translations'):
+            await self.conn.executemany(
+                'REPLACE INTO translation_cache (hash, target_locale, translated, created_at) VALUES (?, ?, ?, ?)',
+                [(h, target_locale, translated, created_at) for h, translated in rows],
+            )
+
+    async def evict_cached_translations(self, created_before: float, max_rows: int) -> None:
+        with DB_QUERY_SECONDS.time(query='evict_cached_translations'), span('db.evict_cached_translations'):
+            await self.conn.execute('DELETE FROM translation_cache WHERE created_at <= ?', (created_before,))
+            await self.conn.execute(
+                'DELETE FROM translation_cache WHERE rowid IN '
+                '(SELECT rowid FROM translation_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                (max_rows,),
+            )
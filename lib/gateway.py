@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import os
+from typing import Any, NamedTuple
+
+from discord import Intents, MemberCacheFlags
+
+
+class GatewayProfile(NamedTuple):
+    """Options of the gateway connection and the caches kept from it."""
+
+    intents: Intents
+    max_messages: int | None
+    chunk_guilds_at_startup: bool
+    member_cache_flags: MemberCacheFlags
+
+    @classmethod
+    def default(cls) -> GatewayProfile:
+        intents = Intents.default()
+        intents.typing = False
+        return cls(intents, 1000, intents.members, MemberCacheFlags.from_intents(intents))
+
+    @classmethod
+    def minimal(cls) -> GatewayProfile:
+        """Only what interactions need. Everything a command reads, including the target message of the context menu
+        and its embeds, comes with the interaction, so no channel, member or message is cached. Guilds listed in READY
+        are still kept, as unavailable guilds.
+        """
+        return cls(Intents.none(), None, False, MemberCacheFlags.none())
+
+    @classmethod
+    def from_env(cls) -> GatewayProfile:
+        match profile := os.getenv('GATEWAY_PROFILE', 'default'):
+            case 'default':
+                return cls.default()
+            case 'minimal':
+                return cls.minimal()
+            case _:
+                raise ValueError(f'unknown GATEWAY_PROFILE: {profile}')
+
+    def options(self) -> dict[str, Any]:
+        """Keyword arguments of discord.Client."""
+        return self._asdict()
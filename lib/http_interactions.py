@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+from contextvars import ContextVar
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientSession, web
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+
+from .metrics import HTTP_INTERACTIONS
+from .setting import KeyInputModal
+
+if TYPE_CHECKING:
+    from aiohttp import BasicAuth
+    from discord.http import MultipartParameters
+    from discord.types.interactions import InteractionCallback, InteractionType
+    from nacl.signing import VerifyKey
+
+    from bot import Bot
+
+logger = getLogger(__name__)
+
+PING = 1
+MODAL_SUBMIT = 5
+DEFERRED_CHANNEL_MESSAGE = 5
+EPHEMERAL = 1 << 6
+PONG = {'type': 1}
+
+
+class InitialResponse:
+    """The initial response of the interaction served by the current request, returned as the body of the request."""
+
+    def __init__(self, interaction_id: int, interaction_type: InteractionType) -> None:
+        self.interaction_id = interaction_id
+        self.interaction_type: InteractionType = interaction_type
+        self.payload: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        # set once the body was written, so that follow-ups do not reach Discord before the response does.
+        self.sent = asyncio.Event()
+
+
+initial_response: ContextVar[InitialResponse | None] = ContextVar('initial_response', default=None)
+
+
+class HTTPResponseAdapter(AsyncWebhookAdapter):
+    """Webhook adapter which answers the interaction of the current request in its HTTP response.
+
+    Other calls, and initial responses with files, go to the REST API as usual.
+    """
+
+    async def create_interaction_response(
+        self,
+        interaction_id: int,
+        token: str,
+        *,
+        session: ClientSession,
+        proxy: str | None = None,
+        proxy_auth: BasicAuth | None = None,
+        params: MultipartParameters,
+    ) -> InteractionCallback:
+        pending = initial_response.get()
+        if pending is None or pending.interaction_id != interaction_id or pending.payload.done() or params.files:
+            return await super().create_interaction_response(
+                interaction_id, token, session=session, proxy=proxy, proxy_auth=proxy_auth, params=params
+            )
+
+        payload: dict[str, Any] = params.payload or {}
+        data: dict[str, Any] = payload.get('data') or {}
+        pending.payload.set_result(payload)
+        await pending.sent.wait()
+        # what Discord returns for a response without a message.
+        return {
+            'interaction': {
+                'id': str(interaction_id),
+                'type': pending.interaction_type,
+                'response_message_loading': payload.get('type') == DEFERRED_CHANNEL_MESSAGE,
+                'response_message_ephemeral': bool(data.get('flags', 0) & EPHEMERAL),
+            }
+        }
+
+
+adapter = HTTPResponseAdapter()
+
+
+# PyNaCl is only needed to serve interactions over HTTP, it is imported once a server is created.
+def verify_key(public_key: str) -> VerifyKey:
+    try:
+        from nacl.signing import VerifyKey
+    except ImportError:
+        raise RuntimeError('PyNaCl is required to serve interactions over HTTP, run `uv sync --extra http`') from None
+    return VerifyKey(bytes.fromhex(public_key))
+
+
+def is_signed(key: VerifyKey, signature: str, timestamp: str, body: bytes) -> bool:
+    from nacl.exceptions import BadSignatureError
+
+    try:
+        key.verify(timestamp.encode() + body, bytes.fromhex(signature))
+    except (BadSignatureError, ValueError):
+        return False
+    return True
+
+
+def user_id_of(data: dict[str, Any]) -> int:
+    return int((data.get('member') or data)['user']['id'])
+
+
+class InteractionServer:
+    """Receives interactions over HTTP and dispatches them as the gateway would, without a gateway connection.
+
+    Keeps no state between requests. With user settings read from the database on each request, several workers can
+    serve behind a load balancer, on the host of the SQLite database they share.
+    """
+
+    def __init__(self, bot: Bot, public_key: str, *, response_timeout: float) -> None:
+        self.bot = bot
+        self.key = verify_key(public_key)
+        self.response_timeout = response_timeout
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        signature = request.headers.get('X-Signature-Ed25519', '')
+        timestamp = request.headers.get('X-Signature-Timestamp', '')
+        if not is_signed(self.key, signature, timestamp, body):
+            HTTP_INTERACTIONS.inc(type='unknown', status='401')
+            return web.Response(status=401, text='invalid request signature')
+
+        data = json.loads(body)
+        kind = str(data.get('type'))
+        if data.get('type') == PING:
+            HTTP_INTERACTIONS.inc(type=kind, status='200')
+            return web.json_response(PONG)
+
+        # copied into the tasks the interaction is dispatched to.
+        pending = InitialResponse(int(data['id']), data['type'])
+        initial_response.set(pending)
+        async_context.set(adapter)
+        self.restore_modal(data)
+        self.bot._connection.parse_interaction_create(data)
+
+        try:
+            async with asyncio.timeout(self.response_timeout):
+                payload = await pending.payload
+        except TimeoutError:
+            pending.payload.cancel()
+            logger.warning(f'interaction {data["id"]} of type {kind} was not answered in time')
+            HTTP_INTERACTIONS.inc(type=kind, status='500')
+            return web.Response(status=500, text='no response')
+
+        response = web.json_response(payload)
+        try:
+            await response.prepare(request)
+            await response.write_eof()
+        finally:
+            pending.sent.set()
+        HTTP_INTERACTIONS.inc(type=kind, status='200')
+        return response
+
+    def restore_modal(self, data: dict[str, Any]) -> None:
+        """Register the modal of a submission when it was opened through another worker."""
+        if data.get('type') != MODAL_SUBMIT:
+            return
+        custom_id: str = data['data']['custom_id']
+        store = self.bot._connection._view_store
+        if custom_id.startswith(KeyInputModal.custom_id_prefix) and custom_id not in store._modals:
+            store.add_view(KeyInputModal.restore(self.bot.api_client, user_id_of(data), custom_id))
+
+    async def serve(self, host: str, port: int) -> None:
+        app = web.Application()
+        app.router.add_post('/interactions', self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        # workers on one host may share the port.
+        await web.TCPSite(runner, host, port, reuse_port=hasattr(socket, 'SO_REUSEPORT')).start()
+        logger.info(f'serving interactions on http://{host}:{port}/interactions')
+        try:
+            await asyncio.Future()
+        finally:
+            await runner.cleanup()
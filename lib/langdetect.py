@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from .placeholder import PROTECTED
+
+if TYPE_CHECKING:
+    from .locale import LocaleString
+
+HANGUL = re.compile(r'[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]')
+KANA = re.compile(r'[\u3040-\u30ff]')
+HAN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]')
+GREEK = re.compile(r'[\u0370-\u03ff]')
+ARABIC = re.compile(r'[\u0600-\u06ff]')
+# letters of Persian and Urdu, which are written in Arabic script too.
+PERSIAN_URDU = re.compile(r'[\u067e\u0686\u0698\u06af\u06a9\u06cc\u0679\u0688\u0691\u06ba\u06d2\u06c1]')
+WORD = re.compile(r'[^\W\d_]+')
+
+# frequent function words of each language written in Latin or Cyrillic script. words of a single letter, and short
+# ones frequent in languages not listed (like "de", "el" or "is"), are left out: they tell little apart.
+STOP_WORDS: dict[str, str] = {
+    'BG': 'не на че аз той как това да но те ние вие така го за вече беше ако се съм си',
+    'CS': 'je se na to že do jak ale co tak jsem už by jsou pro od jeho není také který když nebo',
+    'DA': 'og at det som på er af for med til den har ikke jeg om et men var så vi kan du eller også hvad '
+    'noget meget nu dig mig sig',
+    'DE': 'der die das und ist nicht ich zu den mit sich des auf für ein eine dem es auch wir sie wird sind aber '
+    'noch bei oder wenn haben',
+    'EN': 'the and is are of to in that it you for with this was have be on not but what they we will can your '
+    'from at there if just',
+    'ES': 'los las es del que un una por con para no se lo como pero más está son su muy hay yo también este esta',
+    'ET': 'ja on ei see et oli kui aga ta mina sina me nad ka siis seda veel kas või nüüd ainult ole olen mis ning',
+    'FI': 'ja on ei se että oli kun mutta hän minä sinä me te he niin kuin tämä myös ovat jos nyt vain tai mitä olen',
+    'FR': 'le la les et est des un une du que pas pour dans ce qui sur au avec sont je nous vous mais il elle ont '
+    'cette très',
+    'HU': 'az és hogy nem egy van meg ez csak már mint még volt nincs vagy mert nagyon én ha',
+    'ID': 'yang dan di ini itu dengan untuk tidak dari dalam akan pada ke saya kamu kami ada juga bisa sudah atau '
+    'karena apa',
+    'IT': 'il lo gli la le di che non un una per con sono del della ma anche questo questa io più ci ho hai molto nel',
+    'LT': 'ir yra kad ne su tai bet kaip aš tu jis ji mes jūs jie buvo iš už taip dar labai tik apie arba',
+    'LV': 'un ir ka ne uz ar tas bet kā es tu viņš viņa mēs jūs viņi bija no par jā vēl ļoti tikai vai arī',
+    'NB': 'og at det som på er av for med til den har ikke jeg om et men var så vi kan du eller også hva '
+    'noe mye nå deg meg seg',
+    'NL': 'het een en van is dat niet ik je zijn op te met voor maar ook er wat als bij nog naar wij jullie heeft deze',
+    'PL': 'nie na się to jest że do jak ale co tak jestem już czy tylko mnie był są dla od tego jej ten',
+    'PT': 'os as do da dos das que em um uma não para com se por mais mas como está são muito você também isso ao',
+    'RO': 'și în că este nu pe cu la un din pentru sunt mai care dar ce se eu tu foarte fost acest această',
+    'RU': 'не на что он как это по но они мы вы то все так его за уже был если',
+    'SK': 'je sa na to že do ako ale čo tak som už by sú pre od jeho nie aj ktorý keď alebo',
+    'SL': 'in je se na to da za kot ampak kaj tako sem že bi so ki pa ni tudi ali bo smo mi',
+    'SV': 'och att det som på är av för med till den har inte jag om ett men var så vi kan du eller också '
+    'hur vad mig dig sig',
+    'TR': 've bir bu da için ile ne çok ben sen var yok gibi daha ama mı mi değil olarak kadar şey her',
+    'UK': 'не на що він як це та але ми ви так його за вже був якщо',
+}
+# languages DeepL does not translate into, which share words with the ones above. they are scored like the others,
+# and text which looks most like one of them is not taken for any language.
+NEIGHBOUR_STOP_WORDS: dict[str, str] = {
+    'CA': 'els les és del que un una per amb no com però més són al als aquest aquesta molt també seu hi ha fa pel '
+    'dels codi',
+    'GL': 'os as do da dos das que en un unha non para con se por máis como está son moi tamén iso ao pero ten',
+    'HR': 'je se na da za ne su to od kao što ali sam bi ili kako sve smo ste biti vrlo koji',
+    'LA': 'et in est non ad cum quod ut sed qui quae si esse per ex atque enim sunt nec etiam autem tamen hoc',
+    'MS': 'yang dan di ini itu dengan untuk tidak dari dalam akan pada ke saya kamu kami ada juga boleh sudah atau '
+    'kerana apa tak sahaja',
+}
+# letters used by few languages. each distinct one found counts as a stop word.
+MARKERS: dict[str, str] = {
+    'BG': 'ъ',
+    'CS': 'řěů',
+    'DA': 'øæ',
+    'DE': 'ß',
+    'ES': 'ñ¿¡',
+    'FR': 'œ',
+    'HU': 'őű',
+    'LT': 'ėįų',
+    'LV': 'āēīķļņģ',
+    'NB': 'øæ',
+    'PL': 'łąęśźżń',
+    'PT': 'ã',
+    'RO': 'șță',
+    'RU': 'ыэё',
+    'SK': 'ľĺŕ',
+    'TR': 'ğış',
+    'UK': 'іїєґ',
+}
+
+WORD_LANGUAGES: dict[str, tuple[str, ...]] = {}
+for language, words in (STOP_WORDS | NEIGHBOUR_STOP_WORDS).items():
+    for word in words.split():
+        WORD_LANGUAGES[word] = (*WORD_LANGUAGES.get(word, ()), language)
+MARKER_LANGUAGES: dict[str, tuple[str, ...]] = {}
+for language, letters in MARKERS.items():
+    for letter in letters:
+        MARKER_LANGUAGES[letter] = (*MARKER_LANGUAGES.get(letter, ()), language)
+
+MIN_SCRIPT_LETTERS = 4
+MIN_WORDS = 3
+# stop words the best language must have, and have more of than the runner-up.
+MIN_SCORE = 3
+MIN_MARGIN = 3
+# only the start of long texts is looked at, it tells the language as well as the rest.
+MAX_SAMPLE = 1024
+# languages DeepL translates into regional variants (EN-GB and EN-US, PT-BR and PT-PT, simplified and traditional
+# Chinese) which detect_language cannot tell apart.
+REGIONAL_LANGUAGES = frozenset(('EN', 'PT', 'ZH'))
+
+
+# a message translated into several locales is detected once.
+@lru_cache(maxsize=1024)
+def detect_language(text: str) -> str | None:
+    """Language (DeepL code without region) of text, or None unless it is clear.
+
+    Only the first MAX_SAMPLE characters are looked at.
+    """
+    text = PROTECTED.sub(' ', text[:MAX_SAMPLE])
+    letters = sum(1 for c in text if c.isalpha())
+    if not letters:
+        return None
+
+    if PERSIAN_URDU.search(text):
+        # Arabic script alone does not tell Arabic from Persian or Urdu.
+        return None
+    # languages told apart by script alone. kanji count for Japanese if there is kana, for Korean if hangul.
+    hangul, kana, han = len(HANGUL.findall(text)), len(KANA.findall(text)), len(HAN.findall(text))
+    for language, count in (
+        ('KO', hangul + han if hangul else 0),
+        ('JA', kana + han if kana and not hangul else 0),
+        ('ZH', han if not kana and not hangul else 0),
+        ('EL', len(GREEK.findall(text))),
+        ('AR', len(ARABIC.findall(text))),
+    ):
+        if count >= MIN_SCRIPT_LETTERS and count >= letters * 0.6:
+            return language
+    if hangul or kana or han or GREEK.search(text) or ARABIC.search(text):
+        # mixed scripts.
+        return None
+
+    words = WORD.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    scores: dict[str, int] = {}
+    for word in words:
+        for language in WORD_LANGUAGES.get(word, ()):
+            scores[language] = scores.get(language, 0) + 1
+    for letter in set(text.lower()).intersection(MARKER_LANGUAGES):
+        for language in MARKER_LANGUAGES[letter]:
+            scores[language] = scores.get(language, 0) + 1
+    if not scores:
+        return None
+
+    (best, top), *rest = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    second = rest[0][1] if rest else 0
+    if best in NEIGHBOUR_STOP_WORDS:
+        return None
+    if top >= MIN_SCORE and top - second >= MIN_MARGIN and top >= second * 2 and top >= len(words) * 0.15:
+        return best
+    return None
+
+
+def is_in_locale(text: str, locale: LocaleString) -> bool:
+    """Whether text is confidently in locale already.
+
+    Never for languages in REGIONAL_LANGUAGES, since text in English may still be wanted in the other spelling.
+    """
+    language = locale.partition('-')[0]
+    return language not in REGIONAL_LANGUAGES and detect_language(text) == language
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-from functools import cache
-from typing import Literal, TypeGuard, get_args
+import re
+import unicodedata
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING, Literal, TypeGuard, get_args
 
 from discord import Interaction, Locale as DiscordLocale
 from discord.app_commands import Choice, Transformer
 
+from .cache import LRUCache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 type LocaleString = Literal[  # type: ignore[valid-type]
     'AR',
     'BG',
@@ -50,6 +57,22 @@ def is_valid_locale(locale: str) -> TypeGuard[LocaleString]:
     return locale in valid_locale_strings
 
 
+# target locales of a user are stored comma separated in one column.
+MAX_TARGET_LOCALES = 4
+
+
+def parse_locales(value: str | None) -> tuple[LocaleString, ...]:
+    """Valid locales in a comma separated value, without duplicates."""
+    if not value:
+        return ()
+    locales: dict[LocaleString, None] = dict.fromkeys(locale for locale in value.split(',') if is_valid_locale(locale))
+    return tuple(locales)[:MAX_TARGET_LOCALES]
+
+
+def join_locales(locales: Iterable[LocaleString]) -> str:
+    return ','.join(dict.fromkeys(locales))
+
+
 @cache
 def discord_locale_into_deepl_locale(discord_locale: DiscordLocale) -> LocaleString | None:
     """Convert discord_locale into DeepL locale. If discord_locale is not supported, return None."""
@@ -96,7 +119,7 @@ choice_label: dict[LocaleString, str] = {
     'PT': 'PT (português)',
     'PT-BR': 'PT-BR (Português brasileiro)',
     'PT-PT': 'PT-PT (português europeu)',
-    'RO': 'RO (limba )',
+    'RO': 'RO (limba română)',
     'RU': 'RU (русский язык)',
     'SK': 'SK (slovenčina)',
     'SL': 'SL (slovenščina)',
@@ -107,26 +130,134 @@ choice_label: dict[LocaleString, str] = {
 }
 
 
+english_name: dict[LocaleString, str] = {
+    'AR': 'Arabic',
+    'BG': 'Bulgarian',
+    'CS': 'Czech',
+    'DA': 'Danish',
+    'DE': 'German',
+    'EL': 'Greek',
+    'EN': 'English',
+    'EN-GB': 'English (British)',
+    'EN-US': 'English (American)',
+    'ES': 'Spanish',
+    'ET': 'Estonian',
+    'FI': 'Finnish',
+    'FR': 'French',
+    'HU': 'Hungarian',
+    'ID': 'Indonesian',
+    'IT': 'Italian',
+    'JA': 'Japanese',
+    'KO': 'Korean',
+    'LT': 'Lithuanian',
+    'LV': 'Latvian',
+    'NB': 'Norwegian (Bokmål)',
+    'NL': 'Dutch',
+    'PL': 'Polish',
+    'PT': 'Portuguese',
+    'PT-BR': 'Portuguese (Brazilian)',
+    'PT-PT': 'Portuguese (European)',
+    'RO': 'Romanian',
+    'RU': 'Russian',
+    'SK': 'Slovak',
+    'SL': 'Slovenian',
+    'SV': 'Swedish',
+    'TR': 'Turkish',
+    'UK': 'Ukrainian',
+    'ZH': 'Chinese',
+}
+
+MAX_CHOICES = 25
+WORD = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """Case and accent insensitive form of text."""
+    return ''.join(c for c in unicodedata.normalize('NFKD', text.casefold()) if not unicodedata.combining(c)).strip()
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    # substitution, insertion or nothing left.
+    return a[i + 1 :] == b[i + 1 :] or a[i:] == b[i + 1 :]
+
+
+class LocaleEntry:
+    __slots__ = ('code', 'locale', 'names', 'words')
+
+    def __init__(self, locale: LocaleString) -> None:
+        self.locale: LocaleString = locale
+        self.code = normalize(locale)
+        native = choice_label[locale].removeprefix(f'{locale} (').removesuffix(')')
+        self.names = (normalize(english_name[locale]), normalize(native))
+        self.words = tuple({word for name in self.names for word in WORD.findall(name)})
+
+    def rank(self, query: str) -> int | None:
+        """Lower is better. None if query does not match."""
+        if self.code == query:
+            return 0
+        if self.code.startswith(query) or self.code.replace('-', ' ').startswith(query):
+            return 1
+        if any(name.startswith(query) for name in self.names) or any(w.startswith(query) for w in self.words):
+            return 2
+        if any(query in name for name in self.names):
+            return 3
+        # typos, compared with the start of each word, which may be one character shorter or longer than query.
+        if len(query) >= 4 and any(
+            within_one_edit(query, word[:n]) for word in self.words for n in range(len(query) - 1, len(query) + 2)
+        ):
+            return 4
+        return None
+
+
+locale_index = tuple(LocaleEntry(locale) for locale in valid_locale_strings)
+locale_choice: dict[LocaleString, Choice[str]] = {
+    locale: Choice(name=choice_label[locale], value=locale) for locale in valid_locale_strings
+}
+
+
+@lru_cache(maxsize=4096)
+def search_locales(query: str) -> tuple[LocaleString, ...]:
+    """Locales matching a normalized query, best first. The empty query matches all locales."""
+    if not query:
+        return valid_locale_strings
+    ranked: list[tuple[int, int, LocaleString]] = [
+        (rank, i, e.locale) for i, e in enumerate(locale_index) if (rank := e.rank(query)) is not None
+    ]
+    return tuple(locale for _, _, locale in sorted(ranked))
+
+
+@lru_cache(maxsize=4096)
+def locale_choices(default: LocaleString | None, query: str) -> tuple[LocaleString, ...]:
+    """Locales to offer for query, with the locale of the user's Discord client first if it matches."""
+    found = search_locales(query)
+    if default is not None and default in found:
+        return (default, *(locale for locale in found if locale != default))
+    return found
+
+
 class LocaleStringTransformer(Transformer):
+    # locales each user chose recently, newest first.
+    recent: LRUCache[int, tuple[LocaleString, ...]] = LRUCache(max_size=4096, ttl=30 * 24 * 60 * 60)
+
     async def transform(self, interaction: Interaction, value: str) -> LocaleString:
         if is_valid_locale(value):
+            recent = self.recent.get(interaction.user.id) or ()
+            chosen: tuple[LocaleString, ...] = (value, *(locale for locale in recent if locale != value))
+            self.recent.set(interaction.user.id, chosen[:5])
             return value
 
         raise ValueError(f'invalid locale: {value}')
 
     async def autocomplete(self, interaction: Interaction, value: str) -> list[Choice[str]]:  # type: ignore[override]
-        value = value.upper()
-
-        choices: list[Choice[str]] = []
-        if discord_locale := discord_locale_into_deepl_locale(interaction.locale):
-            choices.append(Choice(name=choice_label[discord_locale], value=discord_locale))
-
-        for locale in valid_locale_strings:
-            if len(choices) >= 25:
-                break
-            if not value or value in locale:
-                choice = Choice(name=choice_label[locale], value=locale)
-                if choice not in choices:
-                    choices.append(choice)
-
-        return choices
+        locales = locale_choices(discord_locale_into_deepl_locale(interaction.locale), normalize(value))
+        if recent := self.recent.get(interaction.user.id):
+            matched = [locale for locale in recent if locale in locales]
+            locales = (*matched, *(locale for locale in locales if locale not in matched))
+        return [locale_choice[locale] for locale in locales[:MAX_CHOICES]]
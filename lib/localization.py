@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import sys
 import tomllib
+from logging import getLogger
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, TypedDict, Unpack
+from string import Formatter
+from typing import TYPE_CHECKING
 
 from discord import Interaction, Locale
 from discord.app_commands import Translator, locale_str
@@ -10,6 +15,9 @@ from discord.app_commands import Translator, locale_str
 if TYPE_CHECKING:
     from discord.app_commands import TranslationContextTypes
 
+logger = getLogger(__name__)
+L10N_PATH = Path(__file__).parent / 'l10n.toml'
+
 
 MSG_NEED_KEY = locale_str('You should set your DeepL key on DM first.')
 MSG_NEED_LOCALE = locale_str('You should set your target locale on DM first.')
@@ -19,6 +27,7 @@ MSG_456 = locale_str('Quota exceeded. Can not translate anymore.')
 MSG_429 = locale_str('Too many requests. Please wait a moment.')
 MSG_500_OR_MORE = locale_str('Internal server error. Please try again later.')
 MSG_UNKNOWN_STATUS = locale_str('Unknown error. Please try again later.')
+MSG_NOTHING_TO_TRANSLATE = locale_str('This message has nothing to translate.')
 
 MSG_COMMAND_NAME_SETTING = locale_str('setting')
 MSG_COMMAND_DESCRIPTION_SETTING = locale_str('setting of key and target locale.')
@@ -31,6 +40,13 @@ MSG_COMMAND_DESCRIPTION_KEY = locale_str('set DeepL key for translation in modal
 
 MSG_COMMAND_NAME_LOCALE = locale_str('locale')
 MSG_COMMAND_DESCRIPTION_LOCALE = locale_str('set target locale for translation in select.')
+MSG_OPTION_DESCRIPTION_LOCALE = locale_str('target locale.')
+MSG_OPTION_NAME_LOCALE2 = locale_str('locale2')
+MSG_OPTION_DESCRIPTION_LOCALE2 = locale_str('second target locale, if any.')
+MSG_OPTION_NAME_LOCALE3 = locale_str('locale3')
+MSG_OPTION_DESCRIPTION_LOCALE3 = locale_str('third target locale, if any.')
+MSG_OPTION_NAME_LOCALE4 = locale_str('locale4')
+MSG_OPTION_DESCRIPTION_LOCALE4 = locale_str('fourth target locale, if any.')
 
 MSG_COMMAND_NAME_USAGE = locale_str('usage')
 MSG_COMMAND_DESCRIPTION_USAGE = locale_str('show amount of usage.')
@@ -59,15 +75,9 @@ MSG_SETTING_SHOW_PLACEHOLDER = locale_str("""
 MSG_SETTING_LOCALE_PLACEHOLDER = locale_str('target locale has been set to `{locale}`.')
 
 
-class _TranslateKWargs(TypedDict, total=False):
-    locale: Locale
-    data: Any
-
-
-async def translate(interaction: Interaction, string: str | locale_str, **kwargs: Unpack[_TranslateKWargs]) -> str:
-    if (msg := await interaction.translate(string, **kwargs)) is not None:
-        return msg
-    raise ValueError('Unreachable (failed find translation msg)')
+def render(interaction: Interaction, *strings: str | locale_str) -> list[str]:
+    """All strings a response needs in the interaction's locale, in one lookup of the compiled catalog."""
+    return catalog.render(interaction.locale, *strings)
 
 
 localize_key: dict[locale_str, str] = {
@@ -79,6 +89,7 @@ localize_key: dict[locale_str, str] = {
     MSG_429: 'MSG_429',
     MSG_500_OR_MORE: 'MSG_500_OR_MORE',
     MSG_UNKNOWN_STATUS: 'MSG_UNKNOWN_STATUS',
+    MSG_NOTHING_TO_TRANSLATE: 'MSG_NOTHING_TO_TRANSLATE',
     MSG_COMMAND_NAME_SETTING: 'MSG_COMMAND_NAME_SETTING',
     MSG_COMMAND_DESCRIPTION_SETTING: 'MSG_COMMAND_DESCRIPTION_SETTING',
     MSG_COMMAND_NAME_SHOW: 'MSG_COMMAND_NAME_SHOW',
@@ -87,6 +98,13 @@ localize_key: dict[locale_str, str] = {
     MSG_COMMAND_DESCRIPTION_KEY: 'MSG_COMMAND_DESCRIPTION_KEY',
     MSG_COMMAND_NAME_LOCALE: 'MSG_COMMAND_NAME_LOCALE',
     MSG_COMMAND_DESCRIPTION_LOCALE: 'MSG_COMMAND_DESCRIPTION_LOCALE',
+    MSG_OPTION_DESCRIPTION_LOCALE: 'MSG_OPTION_DESCRIPTION_LOCALE',
+    MSG_OPTION_NAME_LOCALE2: 'MSG_OPTION_NAME_LOCALE2',
+    MSG_OPTION_DESCRIPTION_LOCALE2: 'MSG_OPTION_DESCRIPTION_LOCALE2',
+    MSG_OPTION_NAME_LOCALE3: 'MSG_OPTION_NAME_LOCALE3',
+    MSG_OPTION_DESCRIPTION_LOCALE3: 'MSG_OPTION_DESCRIPTION_LOCALE3',
+    MSG_OPTION_NAME_LOCALE4: 'MSG_OPTION_NAME_LOCALE4',
+    MSG_OPTION_DESCRIPTION_LOCALE4: 'MSG_OPTION_DESCRIPTION_LOCALE4',
     MSG_COMMAND_NAME_USAGE: 'MSG_COMMAND_NAME_USAGE',
     MSG_COMMAND_DESCRIPTION_USAGE: 'MSG_COMMAND_DESCRIPTION_USAGE',
     MSG_COMMAND_NAME_TRANSLATE: 'MSG_COMMAND_NAME_TRANSLATE',
@@ -106,13 +124,90 @@ localize_key: dict[locale_str, str] = {
 }
 
 
+def field_names(template: str) -> set[str]:
+    return {field for _, field, _, _ in Formatter().parse(template) if field is not None}
+
+
+def compile_catalog(source: str) -> tuple[dict[str, dict[str, str]], list[tuple[str, str]]]:
+    """Compile l10n.toml into a flat, interned message -> translation table per locale.
+
+    Every known message is present in each table, untranslated ones map to themselves. A translation whose format
+    fields differ from its message is rejected here instead of failing at str.format. (key, locale) of each rejected
+    translation is returned with the tables.
+    """
+    data: dict[str, dict[str, str]] = tomllib.loads(source)
+    compiled: dict[str, dict[str, str]] = {}
+    rejected: list[tuple[str, str]] = []
+    for locale, translations in data.items():
+        table: dict[str, str] = {}
+        for string, key in localize_key.items():
+            message = string.message
+            text = translations.get(key) or message
+            if text is not message and field_names(text) != field_names(message):
+                rejected.append((key, locale))
+                text = message
+            table[sys.intern(message)] = sys.intern(text)
+        compiled[sys.intern(locale)] = table
+    return compiled, rejected
+
+
+def log_rejected(rejected: list[tuple[str, str]]) -> None:
+    # logged on the event loop, handlers may not be thread safe.
+    for key, locale in rejected:
+        logger.warning(f'ignored translation of {key} for {locale}: format fields differ from the message')
+
+
+class Catalog:
+    def __init__(self) -> None:
+        self.locales: dict[str, dict[str, str]] = {}
+        self.mtime = 0.0
+
+    def load(self, path: Path) -> list[tuple[str, str]]:
+        """Read and compile path, returning the rejected translations. Blocking, run it in a thread."""
+        mtime = path.stat().st_mtime
+        # swapped in one assignment, readers see either the old or the new catalog.
+        self.locales, rejected = compile_catalog(path.read_text('utf-8'))
+        self.mtime = mtime
+        return rejected
+
+    def render(self, locale: Locale, *strings: str | locale_str) -> list[str]:
+        if (table := self.locales.get(locale.value)) is None:
+            return [str(string) for string in strings]
+        return [table.get(message := str(string), message) for string in strings]
+
+
+catalog = Catalog()
+
+
 class DiscordTranslator(Translator):
-    data: dict[str, dict[str, str]]
+    """Translator backed by the compiled catalog. With L10N_HOT_RELOAD=1, l10n.toml is reloaded when it changes.
+
+    A reload changes responses only, command names and descriptions are synced to Discord at startup.
+    """
+
+    reload_task: asyncio.Task[None] | None = None
 
     async def load(self) -> None:
-        self.data = tomllib.loads((Path(__file__).parent / 'l10n.toml').read_text())
+        log_rejected(await asyncio.to_thread(catalog.load, L10N_PATH))
+        if os.getenv('L10N_HOT_RELOAD', '0') == '1':
+            self.reload_task = asyncio.create_task(self.watch(float(os.getenv('L10N_RELOAD_INTERVAL', '2'))))
+
+    async def unload(self) -> None:
+        if self.reload_task is not None:
+            self.reload_task.cancel()
+
+    async def watch(self, interval: float) -> None:
+        seen = catalog.mtime
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if (mtime := (await asyncio.to_thread(L10N_PATH.stat)).st_mtime) == seen:
+                    continue
+                seen = mtime
+                log_rejected(await asyncio.to_thread(catalog.load, L10N_PATH))
+                logger.info('reloaded l10n.toml')
+            except Exception:
+                logger.exception('failed to reload l10n.toml, keeping the loaded catalog')
 
     async def translate(self, string: locale_str, locale: Locale, context: TranslationContextTypes) -> str | None:
-        return (
-            self.data.get(locale.value, {}).get(localize_key[string]) if string in localize_key else None
-        ) or string.message
+        return catalog.render(locale, string)[0]
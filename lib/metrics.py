@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import bisect
+import time
+from contextlib import asynccontextmanager, contextmanager
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Callable, Generator
+
+logger = getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    type = ''
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        REGISTRY.register(self)
+
+    def key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self) -> Generator[str, Any, Any]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} {self.type}'
+
+    def render_functions(self, functions: dict[tuple[str, ...], Callable[[], float]]) -> Generator[str, Any, Any]:
+        for key, fn in functions.items():
+            try:
+                value = fn()
+            except Exception:
+                logger.exception(f'failed to read {self.type} {self.name}')
+                continue
+            yield f'{self.name}{format_labels(self.labels, key)} {value}'
+
+
+class Counter(Metric):
+    """Counter which is incremented, or read at scrape time from a count that only increases."""
+
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+        self.functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self.key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def set_function(self, fn: Callable[[], float], **labels: str) -> None:
+        self.functions[self.key(labels)] = fn
+
+    def render(self) -> Generator[str, Any, Any]:
+        yield from super().render()
+        for key, value in self.values.items():
+            yield f'{self.name}{format_labels(self.labels, key)} {value}'
+        yield from self.render_functions(self.functions)
+
+
+class Gauge(Metric):
+    """Gauge whose value is set, or read from a function at scrape time."""
+
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+        self.functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[self.key(labels)] = value
+
+    def set_function(self, fn: Callable[[], float], **labels: str) -> None:
+        self.functions[self.key(labels)] = fn
+
+    def render(self) -> Generator[str, Any, Any]:
+        yield from super().render()
+        for key, value in self.values.items():
+            yield f'{self.name}{format_labels(self.labels, key)} {value}'
+        yield from self.render_functions(self.functions)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(
+        self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # labels -> (count per bucket (last one is +Inf), sum)
+        self.values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self.key(labels)
+        if (entry := self.values.get(key)) is None:
+            entry = self.values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Generator[None, Any, Any]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> Generator[str, Any, Any]:
+        yield from super().render()
+        for key, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound}"'
+                yield f'{self.name}_bucket{format_labels(self.labels, key, le)} {cumulative}'
+            yield f'{self.name}_sum{format_labels(self.labels, key)} {total[0]}'
+            yield f'{self.name}_count{format_labels(self.labels, key)} {cumulative}'
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return '\n'.join(line for metric in self.metrics.values() for line in metric.render()) + '\n'
+
+
+REGISTRY = Registry()
+
+TRANSLATE_SECONDS = Histogram('translator_translate_seconds', 'Latency of Client.translate_stream.')
+FETCH_USAGE_SECONDS = Histogram('translator_fetch_usage_seconds', 'Latency of Client.fetch_usage.')
+DEEPL_REQUEST_SECONDS = Histogram(
+    'translator_deepl_request_seconds', 'Latency of each DeepL HTTP request (per attempt).', ('path',)
+)
+DEEPL_RESPONSES = Counter('translator_deepl_responses_total', 'DeepL responses by status.', ('path', 'status'))
+DEEPL_ERRORS = Counter('translator_deepl_errors_total', 'DeepL requests failed without response.', ('path', 'error'))
+TRANSLATED_CHARACTERS = Counter('translator_translated_characters_total', 'Characters sent to DeepL for translation.')
+SAVED_CHARACTERS = Counter('translator_saved_characters_total', 'Characters not sent to DeepL.', ('reason',))
+DB_ACQUIRE_SECONDS = Histogram('translator_db_acquire_seconds', 'Wait time to acquire a pooled DB connection.')
+DB_QUERY_SECONDS = Histogram('translator_db_query_seconds', 'Latency of DB queries.', ('query',))
+DISCORD_SEND_SECONDS = Histogram('translator_discord_send_seconds', 'Latency of interaction follow-up sends.')
+HTTP_INTERACTIONS = Counter(
+    'translator_http_interactions_total', 'Interactions received over HTTP by type and status.', ('type', 'status')
+)
+CACHE_SIZE = Gauge('translator_cache_entries', 'Entries in in-memory caches.', ('cache',))
+CACHE_HIT_RATE = Gauge('translator_cache_hit_rate', 'Hit rate of in-memory caches.', ('cache',))
+POOL_IDLE = Gauge('translator_db_pool_idle_connections', 'Idle connections in the DB pool.')
+CONNECTIONS = Counter('translator_deepl_connections_total', 'Connections to DeepL by kind.', ('kind',))
+COALESCED = Counter('translator_coalesced_requests_total', 'Translation requests that joined an in-flight call.')
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=REGISTRY.render(), content_type='text/plain', charset='utf-8')
+
+
+@asynccontextmanager
+async def serve_metrics(host: str, port: int | None) -> AsyncGenerator[None, Any]:
+    """Serve /metrics while in the context. Does nothing if port is None."""
+    if port is None:
+        yield
+        return
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f'serving metrics on http://{host}:{port}/metrics')
+    try:
+        yield
+    finally:
+        await runner.cleanup()
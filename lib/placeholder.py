@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+# spans which must not be translated. earlier alternatives win.
+PROTECTED = re.compile(
+    r'```.*?```'  # code block
+    r'|`[^`\n]+`'  # inline code
+    r'|<a?:\w+:\d+>'  # custom emoji
+    r'|<(?:@[!&]?|#)\d+>'  # user, role and channel mentions
+    r'|</[\w -]+:\d+>'  # slash command mention
+    r'|<t:-?\d+(?::[tTdDfFR])?>'  # timestamp
+    r'|<https?://[^\s>]+>'  # url without embed
+    r'|https?://[^\s<]+[^\s<.,:;"\')\]!?]',  # url
+    re.DOTALL,
+)
+PLACEHOLDER = re.compile(r'<x i="(\d+)"\s*/>|&(lt|gt|amp|quot|apos);')
+ENTITIES = {'lt': '<', 'gt': '>', 'amp': '&', 'quot': '"', 'apos': "'"}
+
+
+class Protected(NamedTuple):
+    """text with protected spans replaced by placeholders, in DeepL XML tag handling form."""
+
+    text: str
+    spans: tuple[str, ...]
+    translatable: bool
+
+
+def escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def protect(text: str) -> Protected:
+    spans: list[str] = []
+    parts: list[str] = []
+    translatable = False
+    last = 0
+    for m in PROTECTED.finditer(text):
+        rest = text[last : m.start()]
+        translatable = translatable or any(c.isalpha() for c in rest)
+        parts.append(escape(rest))
+        parts.append(f'<x i="{len(spans)}"/>')
+        spans.append(m.group())
+        last = m.end()
+    rest = text[last:]
+    translatable = translatable or any(c.isalpha() for c in rest)
+    parts.append(escape(rest))
+    return Protected(''.join(parts), tuple(spans), translatable)
+
+
+def billed_length(text: str) -> int:
+    """Characters DeepL counts for text in XML tag handling form. Tags are free and an escaped character is one."""
+    return len(PLACEHOLDER.sub(lambda m: '' if m.group(2) is None else ENTITIES[m.group(2)], text))
+
+
+def restore(translated: str, spans: tuple[str, ...]) -> str:
+    """Put protected spans back into translated text. Spans dropped by DeepL are appended at the end."""
+    used: set[int] = set()
+
+    def replace(m: re.Match[str]) -> str:
+        if m.group(2) is not None:
+            return ENTITIES[m.group(2)]
+        i = int(m.group(1))
+        if i >= len(spans):
+            return ''
+        used.add(i)
+        return spans[i]
+
+    text = PLACEHOLDER.sub(replace, translated)
+    if missing := [span for i, span in enumerate(spans) if i not in used]:
+        text = ' '.join((text, *missing))
+    return text
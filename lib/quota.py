@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from .cache import LRUCache
+
+
+class UsageRecord:
+    """Last /v2/usage response of a key, plus characters translated since then."""
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.data = data
+        self.fetched_at = time.monotonic()
+
+    @property
+    def remaining_characters(self) -> int | None:
+        if 'character_count' not in self.data or 'character_limit' not in self.data:
+            return None
+        return self.data['character_limit'] - self.data['character_count']
+
+
+class UsageTracker:
+    """Per key usage. Records older than ttl are stale and should be refreshed, but are still used for accounting."""
+
+    def __init__(self, ttl: float, max_size: int = 4096) -> None:
+        self.ttl = ttl
+        # stale records are kept a while longer so that accounting survives a failed refresh.
+        self.records: LRUCache[str, UsageRecord] = LRUCache(max_size, ttl * 10)
+
+    def get(self, key: str) -> UsageRecord | None:
+        return self.records.get(key)
+
+    def is_fresh(self, record: UsageRecord | None) -> bool:
+        return record is not None and time.monotonic() - record.fetched_at < self.ttl
+
+    def set(self, key: str, data: dict[str, Any]) -> UsageRecord:
+        record = UsageRecord(data)
+        self.records.set(key, record)
+        return record
+
+    def add(self, key: str, characters: int) -> None:
+        if (record := self.records.get(key)) is not None and 'character_count' in record.data:
+            record.data['character_count'] += characters
+
+    def exhausted(self, key: str) -> None:
+        if (record := self.records.get(key)) is not None and 'character_limit' in record.data:
+            record.data['character_count'] = max(record.data['character_count'], record.data['character_limit'])
+
+    def allows(self, key: str, characters: int) -> bool:
+        """Whether characters can be translated. Unknown usage is allowed, DeepL decides then.
+
+        A stale record counts as unknown, the quota may have been reset or raised since it was fetched.
+        """
+        if (record := self.records.get(key)) is None or not self.is_fresh(record):
+            return True
+        if (remaining := record.remaining_characters) is None:
+            return True
+        return characters <= remaining
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import random
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple
+
+
+def is_retryable(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse Retry-After header. It is either delay seconds or HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (date - datetime.datetime.now(datetime.UTC)).total_seconds())
+
+
+class RetryPolicy(NamedTuple):
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline: float = 10.0
+    # seconds one attempt may take, so a stalled attempt leaves time to retry before the deadline.
+    attempt_timeout: float = 5.0
+
+    def delay(self, failures: int, retry_after: str | None) -> float:
+        if (seconds := parse_retry_after(retry_after)) is not None:
+            return seconds
+        # exponential backoff with equal jitter.
+        delay = min(self.max_delay, self.base_delay * 2 ** (failures - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class KeyBackoff:
+    """Per API key backoff state. While a key is throttled, every request using it waits."""
+
+    def __init__(self, policy: RetryPolicy) -> None:
+        self.policy = policy
+        # key -> (blocked until (loop time), consecutive failures)
+        self.state: dict[str, tuple[float, int]] = {}
+
+    async def wait(self, key: str, deadline: float) -> bool:
+        """Wait until key is usable. Return False without waiting if it is not usable before deadline."""
+        if key not in self.state:
+            return True
+        blocked_until = self.state[key][0]
+        now = asyncio.get_running_loop().time()
+        if blocked_until > deadline:
+            return False
+        if blocked_until > now:
+            await asyncio.sleep(blocked_until - now)
+        return True
+
+    def failed(self, key: str, retry_after: str | None) -> float:
+        """Record a throttled or failed response and return the loop time when the key is usable again."""
+        blocked_until, failures = self.state.get(key, (0.0, 0))
+        failures += 1
+        now = asyncio.get_running_loop().time()
+        blocked_until = max(blocked_until, now + self.policy.delay(failures, retry_after))
+        self.state[key] = (blocked_until, failures)
+        return blocked_until
+
+    def succeeded(self, key: str) -> None:
+        self.state.pop(key, None)
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import os
 from typing import TYPE_CHECKING, Self
 
 from discord import Interaction, ui
-from discord.app_commands import Group, Transform, allowed_contexts, allowed_installs, command
+from discord.app_commands import Group, Transform, allowed_contexts, allowed_installs, command, describe, rename
 
 from .client import Client as ApiClient, is_free_user
 from .db import UserInfo
-from .locale import LocaleString, LocaleStringTransformer
+from .locale import LocaleString, LocaleStringTransformer, join_locales, parse_locales
 from .localization import (
     MSG_COMMAND_DESCRIPTION_KEY,
     MSG_COMMAND_DESCRIPTION_LOCALE,
@@ -24,9 +25,16 @@ from .localization import (
     MSG_KEY_MODAL_TITLE,
     MSG_KEY_SAVED,
     MSG_NOT_SET,
+    MSG_OPTION_DESCRIPTION_LOCALE,
+    MSG_OPTION_DESCRIPTION_LOCALE2,
+    MSG_OPTION_DESCRIPTION_LOCALE3,
+    MSG_OPTION_DESCRIPTION_LOCALE4,
+    MSG_OPTION_NAME_LOCALE2,
+    MSG_OPTION_NAME_LOCALE3,
+    MSG_OPTION_NAME_LOCALE4,
     MSG_SETTING_LOCALE_PLACEHOLDER,
     MSG_SETTING_SHOW_PLACEHOLDER,
-    translate,
+    render,
 )
 
 if TYPE_CHECKING:
@@ -34,10 +42,21 @@ if TYPE_CHECKING:
 
 
 class KeyInputModal(ui.Modal):
-    key: ui.TextInput[Self] = ui.TextInput(label='key', placeholder='your DeepL key.', default='')
-
-    def __init__(self, api_client: ApiClient, user_info: UserInfo, title: str, label: str, placeholder: str) -> None:
-        super().__init__(title=title)
+    # a submission can reach a process other than the one which opened the modal, see restore.
+    custom_id_prefix = 'setting-key:'
+    key: ui.TextInput[Self] = ui.TextInput(label='key', placeholder='your DeepL key.', default='', custom_id='key')
+
+    def __init__(
+        self,
+        api_client: ApiClient,
+        user_info: UserInfo,
+        title: str,
+        label: str,
+        placeholder: str,
+        *,
+        custom_id: str | None = None,
+    ) -> None:
+        super().__init__(title=title, custom_id=custom_id or f'{self.custom_id_prefix}{os.urandom(16).hex()}')
         self.key.label = label
         self.key.placeholder = placeholder
         self.api_client = api_client
@@ -46,13 +65,16 @@ class KeyInputModal(ui.Modal):
         if user_info.key is not None:
             self.key.default = user_info.key
 
+    @classmethod
+    def restore(cls, api_client: ApiClient, user_id: int, custom_id: str) -> Self:
+        """The modal a submission with custom_id was sent from. Only what on_submit needs is set."""
+        return cls(api_client, UserInfo(user_id, None, None), '-', '-', '-', custom_id=custom_id)
+
     async def on_submit(self, interaction: Interaction) -> None:
-        user_info = self.user_info._replace(key=self.key.value)
-        async with self.api_client.db() as db:
-            await db.update_user_info(user_info)
+        await self.api_client.update_user_field(self.user_info.user_id, 'key', self.key.value)
 
         ephemeral = not interaction.context.dm_channel
-        await interaction.response.send_message(await translate(interaction, MSG_KEY_SAVED), ephemeral=ephemeral)
+        await interaction.response.send_message(render(interaction, MSG_KEY_SAVED)[0], ephemeral=ephemeral)
 
 
 @allowed_contexts(guilds=True, dms=True, private_channels=True)
@@ -72,46 +94,59 @@ class Setting(Group):
     @command(name=MSG_COMMAND_NAME_SHOW, description=MSG_COMMAND_DESCRIPTION_SHOW)
     async def show(self, interaction: Interaction):
         """show your setting."""
-        async with self.api_client.db() as db:
-            user_info = await db.get_user_info(interaction.user.id)
+        user_info = await self.api_client.get_user_info(interaction.user.id)
 
-        has_key = await translate(
+        has_key, locale, msg = render(
             interaction,
             MSG_NOT_SET
             if user_info.key is None
             else MSG_KEY_API_FREE
             if is_free_user(user_info.key)
             else MSG_KEY_API_PRO,
+            ', '.join(user_info.target_locales) or MSG_NOT_SET,
+            MSG_SETTING_SHOW_PLACEHOLDER,
         )
-
-        locale = await translate(interaction, user_info.target_locale or MSG_NOT_SET)
-        msg = await translate(interaction, MSG_SETTING_SHOW_PLACEHOLDER)
         ephemeral = not interaction.context.dm_channel
         await interaction.response.send_message(msg.format(key=has_key, locale=locale), ephemeral=ephemeral)
 
     @command(name=MSG_COMMAND_NAME_KEY, description=MSG_COMMAND_DESCRIPTION_KEY)
     async def key(self, interaction: Interaction):
         """set DeepL key for translation in modal."""
-        async with self.api_client.db() as db:
-            user_info = await db.get_user_info(interaction.user.id)
+        user_info = await self.api_client.get_user_info(interaction.user.id)
+        title, label, placeholder = render(
+            interaction, MSG_KEY_MODAL_TITLE, MSG_KEY_MODAL_LABEL, MSG_KEY_MODAL_PLACEHOLDER
+        )
         await interaction.response.send_modal(
-            KeyInputModal(
-                self.api_client,
-                user_info,
-                title=await translate(interaction, MSG_KEY_MODAL_TITLE),
-                label=await translate(interaction, MSG_KEY_MODAL_LABEL),
-                placeholder=await translate(interaction, MSG_KEY_MODAL_PLACEHOLDER),
-            )
+            KeyInputModal(self.api_client, user_info, title=title, label=label, placeholder=placeholder)
         )
 
     @command(name=MSG_COMMAND_NAME_LOCALE, description=MSG_COMMAND_DESCRIPTION_LOCALE)
-    async def locale(self, interaction: Interaction, locale: Transform[LocaleString, LocaleStringTransformer]):
-        """set target locale for translation in select."""
-        async with self.api_client.db() as db:
-            user_info = await db.get_user_info(interaction.user.id)
-            await db.update_user_info(user_info=user_info._replace(target_locale=locale))
+    # the first option has the name of the command.
+    @rename(
+        locale=MSG_COMMAND_NAME_LOCALE,
+        locale2=MSG_OPTION_NAME_LOCALE2,
+        locale3=MSG_OPTION_NAME_LOCALE3,
+        locale4=MSG_OPTION_NAME_LOCALE4,
+    )
+    @describe(
+        locale=MSG_OPTION_DESCRIPTION_LOCALE,
+        locale2=MSG_OPTION_DESCRIPTION_LOCALE2,
+        locale3=MSG_OPTION_DESCRIPTION_LOCALE3,
+        locale4=MSG_OPTION_DESCRIPTION_LOCALE4,
+    )
+    async def locale(
+        self,
+        interaction: Interaction,
+        locale: Transform[LocaleString, LocaleStringTransformer],
+        locale2: Transform[LocaleString, LocaleStringTransformer] | None = None,
+        locale3: Transform[LocaleString, LocaleStringTransformer] | None = None,
+        locale4: Transform[LocaleString, LocaleStringTransformer] | None = None,
+    ):
+        """set target locales for translation in select. a message is translated into all of them."""
+        value = join_locales(chosen for chosen in (locale, locale2, locale3, locale4) if chosen is not None)
+        await self.api_client.update_user_field(interaction.user.id, 'target_locale', value)
 
         await interaction.response.send_message(
-            (await translate(interaction, MSG_SETTING_LOCALE_PLACEHOLDER)).format(locale=locale),
+            render(interaction, MSG_SETTING_LOCALE_PLACEHOLDER)[0].format(locale=', '.join(parse_locales(value))),
             ephemeral=not interaction.context.dm_channel,
         )
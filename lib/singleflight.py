@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine, Hashable
+    from typing import Any
+
+
+class SingleFlight[K: Hashable, V]:
+    """Share one in-flight call between concurrent callers using the same key.
+
+    The call runs in its own task, so a cancelled caller does not cancel it for the others.
+    Its result or exception is delivered to every caller.
+    """
+
+    def __init__(self) -> None:
+        self.calls: dict[K, asyncio.Task[V]] = {}
+        self.coalesced = 0
+
+    async def do(self, key: K, fn: Callable[[], Coroutine[Any, Any, V]]) -> V:
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self.calls[key] = task
+            task.add_done_callback(lambda t: self.done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def done(self, key: K, task: asyncio.Task[V]) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        # mark the exception as retrieved even when every caller has gone away.
+        if not task.cancelled():
+            task.exception()
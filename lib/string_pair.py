@@ -1,28 +1,140 @@
 from __future__ import annotations
 
+import copy
+import re
+import unicodedata
+from enum import IntEnum
 from logging import getLogger
-from typing import NamedTuple, TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 from discord import Embed, Message
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Any, Generator
 
 logger = getLogger(__name__)
 
 
-def split_line(string: str, num: int) -> Generator[str, Any, Any]:
-    string, num = str(string), int(num)
-    while True:
-        if len(string) <= num:
-            yield string
+# a cut is looked for in the latter half of each window, so each character is scanned a constant number of times.
+SENTENCE_ENDS = ('. ', '! ', '? ', '\u3002', '\uff01', '\uff1f')
+# a code fence line, ``` after at most 3 spaces up to the end of the line. matched after a newline instead of with a
+# multiline ^, which the regex engine tries at every position.
+FENCE_LINE = re.compile(r'\n( {0,3}```[^\n]*)')
+FIRST_FENCE_LINE = re.compile(r' {0,3}```[^\n]*')
+FENCE_CLOSE = '\n```'
+# the fence and language a code block cut across chunks is reopened with, capped so that it stays short.
+FENCE_MARKER = re.compile(r'`{3,8}[\w+#.-]{0,16}')
+# below this limit code blocks are cut like any other text, the fences would not leave room for the content.
+MIN_FENCED_LIMIT = 2 * len(FENCE_CLOSE)
+
+
+def is_regional_indicator(char: str) -> bool:
+    return '\U0001f1e6' <= char <= '\U0001f1ff'
+
+
+def is_grapheme_boundary(string: str, i: int) -> bool:
+    """Whether string can be cut between string[i - 1] and string[i] without breaking a character or emoji sequence."""
+    prev, char = string[i - 1], string[i]
+    if '\ud800' <= prev <= '\udbff' or (prev == '\r' and char == '\n'):
+        return False
+    if prev == '\u200d' or char == '\u200d' or unicodedata.combining(char):
+        return False
+    if (
+        '\ufe00' <= char <= '\ufe0f'  # variation selectors
+        or '\U0001f3fb' <= char <= '\U0001f3ff'  # skin tone modifiers
+        or '\U000e0020' <= char <= '\U000e007f'  # tag sequences
+        or char == '\u20e3'  # keycap
+    ):
+        return False
+    if is_regional_indicator(prev) and is_regional_indicator(char):
+        # flags are pairs of regional indicators. cut only between pairs.
+        j = i - 1
+        while j > 0 and is_regional_indicator(string[j - 1]):
+            j -= 1
+        return (i - j) % 2 == 0
+    return True
+
+
+def fence_lines(string: str) -> list[tuple[int, int]]:
+    """(start, end) of each code fence line."""
+    fences = [m.span(1) for m in FENCE_LINE.finditer(string)]
+    if first := FIRST_FENCE_LINE.match(string):
+        fences.insert(0, first.span())
+    return fences
+
+
+def fence_marker(string: str, pos: int, end: int) -> str:
+    """Fence and language of the fence line string[pos:end], without the rest of the line."""
+    m = FENCE_MARKER.search(string, pos, end)
+    return m.group() if m else '```'
+
+
+def find_cut(string: str, start: int, end: int) -> int:
+    """Find where to cut string[start:] so that the chunk is at most end - start long.
+
+    Prefers paragraph, line, sentence and word boundaries in this order.
+    """
+    lo = start + (end - start) // 2
+    for sep in ('\n\n', '\n'):
+        if (pos := string.rfind(sep, lo, end)) != -1:
+            return pos + len(sep)
+    cut = max(string.rfind(sep, lo, end) + len(sep) for sep in SENTENCE_ENDS)
+    if cut > lo:
+        return cut
+    if (pos := string.rfind(' ', lo, end)) != -1:
+        return pos + 1
+
+    cut = end
+    while cut > start + 1 and not is_grapheme_boundary(string, cut):
+        cut -= 1
+    return cut
+
+
+def split_message(string: str, limit: int = 2000) -> Generator[str, Any, Any]:
+    """Split string into chunks of at most limit characters in a single pass.
+
+    Code blocks cut across chunks are closed at the end of a chunk and reopened at the start of the next one.
+    """
+    string, limit = str(string), int(limit)
+    # (start, end) of each code fence line.
+    fences = fence_lines(string) if limit >= MIN_FENCED_LIMIT else []
+    reserve = len(FENCE_CLOSE) if fences else 0
+    next_fence = 0
+    # (start, end) of the fence line of the code block open at start.
+    open_fence: tuple[int, int] | None = None
+
+    start, length = 0, len(string)
+    while start < length:
+        prefix = f'{fence_marker(string, *open_fence)}\n' if open_fence is not None else ''
+        if limit - len(prefix) - reserve < limit // 2:
+            # the reopened fence would crowd out the content, continue without it.
+            prefix = ''
+        if length - start <= limit - len(prefix):
+            yield prefix + string[start:]
             return
-        str1, str2 = string[:num], string[num:]
-        str1_split = str1.splitlines(keepends=True)
-        if len(str1_split) > 1:
-            str1, str2 = ''.join(str1_split[:-1]), str1_split[-1] + str2
-        yield str1
-        string = str2
+
+        room = limit - len(prefix) - reserve
+        cut = find_cut(string, start, start + room)
+        while next_fence < len(fences) and fences[next_fence][0] < cut:
+            pos, end = fences[next_fence]
+            if cut <= end:
+                # do not cut inside a fence line.
+                if pos > start:
+                    cut = pos
+                    break
+                if end + 1 - start <= room:
+                    cut = min(end + 1, length)
+                # else the fence line does not fit in a chunk, it is cut inside like any other line.
+            open_fence = None if open_fence is not None else (pos, end)
+            next_fence += 1
+
+        assert cut > start, 'split_message must advance on every chunk'
+        chunk = prefix + string[start:cut]
+        if open_fence is not None:
+            chunk = chunk.removesuffix('\n') + FENCE_CLOSE
+        yield chunk
+        start = cut
 
 
 class MessageData(NamedTuple):
@@ -30,89 +142,150 @@ class MessageData(NamedTuple):
     embeds: list[Embed] = []
 
 
-class StringPair:
-    content = 'content'
-    embeds = 'embed'
-    embeds_title = 'title'
-    embeds_description = 'description'
-    embeds_footer = 'footer'
-    embeds_author = 'author'
-    embeds_fields = 'fields'
-    embeds_fields_name = 'name'
-    embeds_fields_value = 'value'
+class Part(IntEnum):
+    """Parts of a message which are translated."""
+
+    CONTENT = 0
+    TITLE = 1
+    DESCRIPTION = 2
+    FOOTER = 3
+    FIELD_NAME = 4
+    FIELD_VALUE = 5
+
+
+# Enum member lookups are slow in hot loops.
+CONTENT, TITLE, DESCRIPTION, FOOTER, FIELD_NAME, FIELD_VALUE = Part
 
+
+class SegmentPath(NamedTuple):
+    """Where a segment comes from. embed and field are indexes into Message.embeds and Embed.fields (-1 if unused)."""
+
+    part: Part
+    embed: int = -1
+    field: int = -1
+
+
+class UniqueSegments(NamedTuple):
+    """Segments with identical texts collapsed. paths[i] uses texts[indexes[i]]."""
+
+    paths: list[SegmentPath]
+    texts: list[str]
+    indexes: list[int]
+    saved_characters: int
+
+
+def deduplicate(segments: Iterable[tuple[SegmentPath, str]]) -> UniqueSegments:
+    paths: list[SegmentPath] = []
+    indexes: list[int] = []
+    seen: dict[str, int] = {}
+    saved = 0
+    for path, text in segments:
+        paths.append(path)
+        if (i := seen.get(text)) is None:
+            i = seen[text] = len(seen)
+        else:
+            saved += len(text)
+        indexes.append(i)
+    return UniqueSegments(paths, list(seen), indexes, saved)
+
+
+def copy_embed(embed: Embed) -> Embed:
+    """Copy embed. Only the mutable parts which are written back to (fields and footer) are copied deeply."""
+    new = copy.copy(embed)
+    if (fields := getattr(embed, '_fields', None)) is not None:
+        new._fields = [dict(field) for field in fields]
+    if (footer := getattr(embed, '_footer', None)) is not None:
+        new._footer = dict(footer)
+    return new
+
+
+def chunk_embeds(embeds: list[Embed]) -> list[list[Embed]]:
+    """Group embeds into messages of at most 10 embeds and 6000 characters."""
+    chunks: list[list[Embed]] = []
+    total = 0
+    for e in embeds:
+        if not chunks or len(chunks[-1]) >= 10 or total + len(e) > 6000:
+            chunks.append([])
+            total = 0
+        chunks[-1].append(e)
+        total += len(e)
+    return chunks
+
+
+class StringPair:
     def __init__(self, msg: Message):
         self.msg = msg
 
-    def encode(self) -> Generator[tuple[str, str], Any, Any]:
-        # content, embeds
+    def encode(self) -> Generator[tuple[SegmentPath, str], Any, Any]:
+        yield from self.encode_content()
+        yield from self.encode_embeds()
+
+    def encode_content(self) -> Generator[tuple[SegmentPath, str], Any, Any]:
         if self.msg.content:
-            yield (self.content, self.msg.content)
-        if self.msg.embeds:
-            for i, e in enumerate(self.msg.embeds):
-                yield from self.encode_embed(i, e)
+            yield (SegmentPath(CONTENT), self.msg.content)
+
+    def encode_embeds(self) -> Generator[tuple[SegmentPath, str], Any, Any]:
+        for i, e in enumerate(self.msg.embeds):
+            yield from self.encode_embed(i, e)
 
-    def encode_embed(self, i: int, e: Embed) -> Generator[tuple[str, str], Any, Any]:
+    def encode_embed(self, i: int, e: Embed) -> Generator[tuple[SegmentPath, str], Any, Any]:
+        path = SegmentPath
         if e.title:
-            yield (f'{self.embeds}.{i}.{self.embeds_title}', e.title)
+            yield (path(TITLE, i), e.title)
         if e.description:
-            yield (f'{self.embeds}.{i}.{self.embeds_description}', e.description)
-        for j, f in enumerate(e.fields):
-            if f.name:
-                yield (f'{self.embeds}.{i}.{self.embeds_fields}.{j}.{self.embeds_fields_name}', f.name)
-            if f.value:
-                yield (f'{self.embeds}.{i}.{self.embeds_fields}.{j}.{self.embeds_fields_value}', f.value)
-        if e.footer and e.footer.text:
-            yield (f'{self.embeds}.{i}.{self.embeds_footer}', e.footer.text)
-
-    def decode(self, pair: tuple[tuple[str, str], ...]) -> list[MessageData]:
+            yield (path(DESCRIPTION, i), e.description)
+        for j, f in enumerate(getattr(e, '_fields', ())):
+            if f['name']:
+                yield (path(FIELD_NAME, i, j), f['name'])
+            if f['value']:
+                yield (path(FIELD_VALUE, i, j), f['value'])
+        if footer := getattr(e, '_footer', {}).get('text'):
+            yield (path(FOOTER, i), footer)
+
+    def decode_content(self, pair: Iterable[tuple[SegmentPath, str]], heading: str = '') -> list[MessageData]:
+        """Messages of the translated content only, for sending it before the embeds."""
+        content, _ = self.apply(pair)
+        if not content:
+            return []
+        if heading:
+            content = f'{heading}\n{content}'
+        return [MessageData(content=content) for content in split_message(content, 2000)]
+
+    def decode_embeds(self, pair: Iterable[tuple[SegmentPath, str]], heading: str = '') -> list[MessageData]:
+        """Messages of the embeds only, for sending them after the content. heading is the content of the first."""
+        _, embeds = self.apply(pair)
+        messages = [MessageData(embeds=es) for es in chunk_embeds(embeds)]
+        if heading and messages:
+            messages[0] = messages[0]._replace(content=heading)
+        return messages
+
+    def apply(self, pair: Iterable[tuple[SegmentPath, str]]) -> tuple[str | None, list[Embed]]:
+        """Content and embeds of the message with translated segments written in."""
         content: str | None = None
-        embeds: list[Embed] = [Embed.from_dict(e.to_dict()) for e in self.msg.embeds]
-        for k, v in pair:
-            if k == self.content:
+        # embeds are copied on first write, untouched ones are sent as is.
+        embeds: list[Embed] = list(self.msg.embeds)
+        copied = [False] * len(embeds)
+        for path, v in pair:
+            if path.part == Part.CONTENT:
                 content = v
-            elif k.startswith(self.embeds):
-                ks = k.split('.')
-                i = int(ks[1])
-                while len(embeds) <= i:
-                    embeds.append(Embed())
-                if ks[2] == self.embeds_title:
-                    embeds[i].title = v
-                elif ks[2] == self.embeds_description:
-                    embeds[i].description = v
-                elif ks[2] == self.embeds_fields:
-                    j = int(ks[3])
-                    while len(embeds[i].fields) <= j:
-                        embeds[i].add_field(name='', value='')
-                    if ks[4] == self.embeds_fields_name:
-                        embeds[i].fields[j].name = v
-                    elif ks[4] == self.embeds_fields_value:
-                        embeds[i].fields[j].value = v
-                    else:
-                        logger.warning(f'invalid key: key={k}, value={v}')
-                elif ks[2] == self.embeds_footer:
-                    embeds[i].set_footer(text=v)
-                else:
-                    logger.warning(f'invalid key: key={k}, value={v}')
-            else:
-                logger.warning(f'invalid key: key={k}, value={v}')
-        if content is None or len(content) < 2000:
-            return [MessageData(content=content, embeds=embeds)]
-        contents = list(split_line(content, 2000))
-
-        chunked_embeds: list[list[Embed]] = [[]]
-        total = 0
-        for e in embeds:
-            if len(chunked_embeds) >= 10 or total + len(e) > 6000:
-                chunked_embeds.append([])
-                total = 0
-            chunked_embeds[-1].append(e)
-            total += len(e)
-
-        chunked_messages = [MessageData(content=content) for content in contents]
-        if chunked_messages:
-            chunked_messages[-1]._replace(embeds=chunked_embeds[0])
-            chunked_messages.extend(MessageData(embeds=es) for es in chunked_embeds[1:])
-        else:
-            chunked_messages = [MessageData(embeds=es) for es in chunked_embeds]
-        return chunked_messages
+                continue
+            if not 0 <= path.embed < len(embeds):
+                logger.warning(f'invalid path: path={path}, value={v}')
+                continue
+
+            if not copied[path.embed]:
+                embeds[path.embed] = copy_embed(embeds[path.embed])
+                copied[path.embed] = True
+            e = embeds[path.embed]
+            match path.part:
+                case Part.TITLE:
+                    e.title = v
+                case Part.DESCRIPTION:
+                    e.description = v
+                case Part.FOOTER if e.footer:
+                    e.set_footer(text=v, icon_url=e.footer.icon_url)
+                case Part.FIELD_NAME | Part.FIELD_VALUE if 0 <= path.field < len(getattr(e, '_fields', ())):
+                    e._fields[path.field]['name' if path.part == Part.FIELD_NAME else 'value'] = v
+                case _:
+                    logger.warning(f'invalid path: path={path}, value={v}')
+        return content, embeds
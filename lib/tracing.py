@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from logging import getLogger
+from types import TracebackType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+logger = getLogger(__name__)
+
+current_trace: ContextVar[Trace | None] = ContextVar('current_trace', default=None)
+NULL_SPAN = nullcontext()
+
+
+class Trace:
+    """Spans of one interaction. Spans are flat, concurrent ones (e.g. DeepL batches) overlap."""
+
+    def __init__(self, name: str, attributes: dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        # (name, start offset, duration)
+        self.spans: list[tuple[str, float, float]] = []
+
+    def record(self) -> dict[str, Any]:
+        return {
+            'trace': self.name,
+            **self.attributes,
+            'total_ms': round((time.perf_counter() - self.start) * 1000, 1),
+            'spans': [
+                {'name': name, 'start_ms': round(offset * 1000, 1), 'ms': round(duration * 1000, 1)}
+                for name, offset, duration in sorted(self.spans, key=lambda s: s[1])
+            ],
+        }
+
+
+class Span:
+    __slots__ = ('name', 'start', 'trace')
+
+    def __init__(self, trace: Trace, name: str) -> None:
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, et: type[BaseException] | None, ev: BaseException | None, eb: TracebackType | None) -> None:
+        end = time.perf_counter()
+        self.trace.spans.append((self.name, self.start - self.trace.start, end - self.start))
+
+
+def span(name: str) -> Span | nullcontext[None]:
+    """Time a block as part of the current trace. Costs one context variable lookup when not traced."""
+    if (trace := current_trace.get()) is None:
+        return NULL_SPAN
+    return Span(trace, name)
+
+
+class Tracer:
+    """Traces a sample_rate fraction of interactions and logs those slower than slow_seconds."""
+
+    def __init__(self, sample_rate: float, slow_seconds: float) -> None:
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Generator[None, Any, Any]:
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            yield
+            return
+
+        trace = Trace(name, attributes)
+        token = current_trace.set(trace)
+        try:
+            yield
+        finally:
+            current_trace.reset(token)
+            if time.perf_counter() - trace.start >= self.slow_seconds:
+                record = trace.record()
+                logger.info(f'slow interaction: {json.dumps(record)}', extra={'trace': record})
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import gzip
+import json
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import TCPConnector, TraceConfig
+
+if TYPE_CHECKING:
+    from types import SimpleNamespace
+
+    from aiohttp import ClientSession, TraceConnectionCreateEndParams, TraceConnectionReuseconnParams
+
+
+class TransportStats:
+    """Counters of new (handshaken) and reused connections to DeepL."""
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.reused = 0
+
+    def trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(self.on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self.on_connection_reuseconn)
+        return trace_config
+
+    async def on_connection_create_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionCreateEndParams
+    ) -> None:
+        self.created += 1
+
+    async def on_connection_reuseconn(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionReuseconnParams
+    ) -> None:
+        self.reused += 1
+
+
+def create_connector(*, limit: int, limit_per_host: int, keepalive_timeout: float) -> TCPConnector:
+    return TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=300,
+        use_dns_cache=True,
+    )
+
+
+def encode_json_body(body: Any, gzip_min_bytes: int) -> tuple[bytes, dict[str, str]]:
+    """Serialize body as JSON. Payloads of gzip_min_bytes or more are gzip compressed (0 disables compression)."""
+    data = json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+    if 0 < gzip_min_bytes <= len(data):
+        data = gzip.compress(data, compresslevel=5)
+        headers['Content-Encoding'] = 'gzip'
+    return data, headers
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .db import DBClient, UserField, UserInfo
+
+logger = getLogger(__name__)
+
+
+class UserWriteBehind:
+    """Buffers user updates and writes them in one transaction after delay, or as soon as max_batch users are pending.
+
+    Updates of the same user are merged, the last write of a field wins. Pending updates are visible through apply
+    until they are written. An update is only durable after the flush, call close before the pool is closed.
+    """
+
+    def __init__(self, db: Callable[..., DBClient], *, delay: float, max_batch: int) -> None:
+        self.db = db
+        self.delay = delay
+        self.max_batch = max_batch
+        self.pending: dict[int, dict[UserField, str | None]] = {}
+        # updates being written, still served to readers until the transaction commits.
+        self.flushing: dict[int, dict[UserField, str | None]] = {}
+        self.flushes = 0
+        self.lock = asyncio.Lock()
+        self.full = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.pending or user_id in self.flushing
+
+    def put(self, user_id: int, fields: dict[UserField, str | None]) -> None:
+        self.pending.setdefault(user_id, {}).update(fields)
+        if len(self.pending) >= self.max_batch:
+            self.full.set()
+        if self.task is None:
+            self.task = asyncio.create_task(self.flush_later())
+
+    def apply(self, user_info: UserInfo) -> UserInfo:
+        """user_info with the updates not yet written applied."""
+        fields: dict[UserField, str | None] = {
+            **self.flushing.get(user_info.user_id, {}),
+            **self.pending.get(user_info.user_id, {}),
+        }
+        return user_info.updated(fields) if fields else user_info
+
+    async def flush_later(self) -> None:
+        try:
+            async with asyncio.timeout(self.delay):
+                await self.full.wait()
+        except TimeoutError:
+            pass
+        self.full.clear()
+        self.task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception('failed to write user updates, retrying later')
+            if self.pending and self.task is None:
+                self.task = asyncio.create_task(self.flush_later())
+
+    async def flush(self) -> None:
+        async with self.lock:
+            if not self.pending:
+                return
+            self.flushing, self.pending = self.pending, {}
+
+            # one statement per set of updated fields.
+            groups: dict[tuple[UserField, ...], list[tuple[Any, ...]]] = {}
+            for user_id, fields in self.flushing.items():
+                keys = tuple(sorted(fields))
+                groups.setdefault(keys, []).append((user_id, *(fields[k] for k in keys)))
+            try:
+                async with self.db() as db:
+                    for keys, rows in groups.items():
+                        await db.update_users(keys, rows)
+            except BaseException:
+                # keep the updates, newer ones made during the flush win.
+                for user_id, fields in self.flushing.items():
+                    self.pending[user_id] = fields | self.pending.get(user_id, {})
+                raise
+            finally:
+                self.flushing = {}
+                self.flushes += 1
+            logger.debug(f'wrote updates of {sum(map(len, groups.values()))} users')
+
+    async def close(self) -> None:
+        if (task := self.task) is not None:
+            self.full.set()
+            await task
+        await self.flush()
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import gzip
 import io
 import logging
 import logging.handlers
 import os
+import shutil
 import types
 from pathlib import Path
+from queue import SimpleQueue
+from typing import NamedTuple
 
 import aiohttp
 import discord
@@ -21,21 +25,34 @@ class FormatterWithTZ(logging.Formatter):
         return datetime.datetime.fromtimestamp(record.created).astimezone(tz=JST).isoformat()
 
 
-class QueueWithAsyncFor[T](asyncio.Queue[T]):  # type: ignore[valid-type, name-defined]
-    def __aiter__(self):
-        return self
+class DropOldestQueue[T](asyncio.Queue[T]):  # type: ignore[valid-type, name-defined]
+    """Bounded queue which drops the oldest item instead of blocking or raising when full."""
 
-    async def __anext__(self):
-        return await self.get()
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(maxsize)
+        self.dropped = 0
+
+    def put_nowait(self, item: T) -> None:  # type: ignore[name-defined]
+        if self.full():
+            self.get_nowait()
+            self.dropped += 1
+        super().put_nowait(item)
+
+
+class LogEntry(NamedTuple):
+    key: tuple[str, str, str | None]  # records with the same key are reported once per digest
+    text: str
 
 
 class WebhookHandler(logging.Handler):
-    def __init__(self, queue: QueueWithAsyncFor[str]) -> None:  # type: ignore[type-arg]
+    def __init__(self, queue: DropOldestQueue[LogEntry]) -> None:  # type: ignore[type-arg]
         self.queue = queue
         super().__init__(level=logging.WARNING)
 
     def emit(self, record: logging.LogRecord) -> None:
-        self.queue.put_nowait(self.format(record))
+        text = self.format(record)
+        # format() caches the traceback in exc_text.
+        self.queue.put_nowait(LogEntry((record.name, record.getMessage(), record.exc_text), text))
 
 
 class WebhookCtxMgr:
@@ -51,38 +68,91 @@ class WebhookCtxMgr:
         return await self.__session.__aexit__(et, ev, eb)
 
 
+MAX_MESSAGE_LENGTH = 2000
+MAX_FILE_BYTES = 8 * 1024 * 1024
+
+
 class WebhookSender:
-    def __init__(self, url: str, queue: QueueWithAsyncFor[str]) -> None:  # type: ignore[type-arg]
+    """Sends queued log records as one digest per interval, as a message or as a file if it is too long."""
+
+    def __init__(
+        self,
+        url: str,
+        queue: DropOldestQueue[LogEntry],  # type: ignore[type-arg]
+        interval: float = 5,
+        max_backoff: float = 60,
+    ) -> None:
         self.url = url
         self.queue = queue
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.reported_dropped = 0
 
     async def run(self):
         async with WebhookCtxMgr(url=self.url) as webhook:
-            async for msg in self.queue:
-                if len(msg) <= 1990:
-                    await self.send_msg(msg=f'```py\n{msg}```', webhook=webhook)
-                else:
-                    await self.send_msg(
-                        file=discord.File(io.BytesIO(msg.encode('utf-8')), filename='log.txt'),
-                        webhook=webhook,
-                    )
-
-    async def send_msg(self, msg: str | None = None, file: discord.File | None = None, *, webhook: discord.Webhook):
-        sleep_until = 4
+            while True:
+                entries = [await self.queue.get()]
+                # let records of the same incident gather into one digest.
+                await asyncio.sleep(self.interval)
+                while not self.queue.empty():
+                    entries.append(self.queue.get_nowait())
+                await self.send_digest(self.digest(entries), webhook=webhook)
+
+    def digest(self, entries: list[LogEntry]) -> str:
+        counts: dict[tuple[str, str, str | None], int] = {}
+        texts: list[str] = []
+        for entry in entries:
+            if entry.key not in counts:
+                counts[entry.key] = 0
+                texts.append(entry.text)
+            counts[entry.key] += 1
+
+        parts: list[str] = []
+        if dropped := self.queue.dropped - self.reported_dropped:
+            self.reported_dropped = self.queue.dropped
+            parts.append(f'{dropped} log records were dropped because the queue was full.')
+        for text, count in zip(texts, counts.values()):
+            parts.append(text if count == 1 else f'[repeated {count} times] {text}')
+        return '\n'.join(parts)
+
+    async def send_digest(self, digest: str, *, webhook: discord.Webhook):
+        if len(digest) <= MAX_MESSAGE_LENGTH - len('```py\n```'):
+            await self.send_msg(msg=f'```py\n{digest}```', webhook=webhook)
+            return
+
+        data = digest.encode('utf-8')
+        if len(data) > MAX_FILE_BYTES:
+            data = data[: MAX_FILE_BYTES - 64] + b'\n... truncated'
+        await self.send_msg(data=data, webhook=webhook)
+
+    async def send_msg(self, msg: str | None = None, data: bytes | None = None, *, webhook: discord.Webhook):
+        sleep_until = 4.0
         while True:
             try:
-                if file is not None:
-                    await webhook.send(file=file)
+                if data is not None:
+                    # a File is consumed by a send, so make a new one for every attempt.
+                    await webhook.send(file=discord.File(io.BytesIO(data), filename='log.txt'))
                 elif msg is not None:
                     await webhook.send(msg)
             except Exception:
                 await asyncio.sleep(sleep_until)
-                sleep_until <<= 2
+                sleep_until = min(sleep_until * 2, self.max_backoff)
             else:
                 break
 
 
-def setup_logging(queue: QueueWithAsyncFor[str]):  # type: ignore[type-arg]
+def gzip_namer(name: str) -> str:
+    return f'{name}.gz'
+
+
+def gzip_rotator(source: str, dest: str) -> None:
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def setup_logging(queue: DropOldestQueue[LogEntry]) -> logging.handlers.QueueListener:  # type: ignore[type-arg]
+    """Set up logging. File and stream output is written by the returned listener's thread, which must be stopped."""
     logging.getLogger('discord').setLevel(logging.NOTSET)
     logging.getLogger('asyncio').setLevel(logging.NOTSET)
     logging.getLogger('lib').setLevel(logging.NOTSET)
@@ -93,37 +163,61 @@ def setup_logging(queue: QueueWithAsyncFor[str]):  # type: ignore[type-arg]
 
     fmt = FormatterWithTZ('{asctime};{name};{levelname};{message}', style='{')
 
-    fh = logging.handlers.TimedRotatingFileHandler(filename='log/bot.log', encoding='utf-8', when='midnight')
+    fh = logging.handlers.RotatingFileHandler(
+        filename='log/bot.log',
+        encoding='utf-8',
+        maxBytes=int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+        backupCount=int(os.getenv('LOG_BACKUP_COUNT', '10')),
+    )
+    fh.namer = gzip_namer
+    fh.rotator = gzip_rotator
     fh.setLevel(logging.NOTSET)
     fh.setFormatter(fmt)
-    log.addHandler(fh)
 
     sh = logging.StreamHandler()
     sh.setLevel(logging.INFO)
     sh.setFormatter(fmt)
-    log.addHandler(sh)
+
+    # the event loop only merges messages and tracebacks. formatting, writes and rotation run on the listener thread.
+    qh = logging.handlers.QueueHandler(SimpleQueue())
+    qh.setLevel(logging.NOTSET)
+    log.addHandler(qh)
+    listener = logging.handlers.QueueListener(qh.queue, fh, sh, respect_handler_level=True)
+    listener.start()
 
     wh = WebhookHandler(queue)
     wh.setLevel(logging.WARNING)
     wh.setFormatter(fmt)
     log.addHandler(wh)
 
+    return listener
+
 
 async def main():
-    queue: QueueWithAsyncFor[str] = QueueWithAsyncFor()  # type: ignore[type-arg]
-    setup_logging(queue)
+    queue: DropOldestQueue[LogEntry] = DropOldestQueue(int(os.getenv('WEBHOOK_QUEUE_SIZE', '1000')))  # type: ignore[type-arg]
+    listener = setup_logging(queue)
 
     from bot import Bot
 
     bot = Bot()
-    webhook_sender = WebhookSender(url=os.environ['WEBHOOK_URL'], queue=queue)
+    webhook_sender = WebhookSender(
+        url=os.environ['WEBHOOK_URL'],
+        queue=queue,
+        interval=float(os.getenv('WEBHOOK_INTERVAL', '5')),
+        max_backoff=float(os.getenv('WEBHOOK_MAX_BACKOFF', '60')),
+    )
 
     try:
         async with asyncio.TaskGroup() as tg:
-            tg.create_task(bot.runner())
+            if interactions_port := os.getenv('INTERACTIONS_PORT'):
+                tg.create_task(bot.serve_interactions(int(interactions_port)))
+            else:
+                tg.create_task(bot.runner())
             tg.create_task(webhook_sender.run())
     except* Exception:
         logging.getLogger('bot').exception('Bot is finished with exception. Raised exception is:')
+    finally:
+        listener.stop()
 
 
 if __name__ == '__main__':
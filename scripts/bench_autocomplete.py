@@ -0,0 +1,100 @@
+"""Latency benchmark of the locale autocomplete.
+
+usage: python -m scripts.bench_autocomplete [--repeat 5]
+
+Compares lib.locale.LocaleStringTransformer.autocomplete with the previous linear scan over locale codes, with the
+query caches warm and cleared before every call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from discord import Locale as DiscordLocale
+from discord.app_commands import Choice
+
+from lib.locale import (
+    LocaleStringTransformer,
+    choice_label,
+    discord_locale_into_deepl_locale,
+    locale_choices,
+    search_locales,
+    valid_locale_strings,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
+QUERIES = ('', 'e', 'en', 'EN-G', 'pt-br', 'ger', 'deutsch', 'japnese', 'portugues', '日本', 'español', 'xyz')
+
+
+async def previous_autocomplete(interaction: Any, value: str) -> list[Choice[str]]:
+    """The implementation LocaleStringTransformer.autocomplete replaced, kept for comparison."""
+    value = value.upper()
+
+    choices: list[Choice[str]] = []
+    if discord_locale := discord_locale_into_deepl_locale(interaction.locale):
+        choices.append(Choice(name=choice_label[discord_locale], value=discord_locale))
+
+    for locale in valid_locale_strings:
+        if len(choices) >= 25:
+            break
+        if not value or value in locale:
+            choice = Choice(name=choice_label[locale], value=locale)
+            if choice not in choices:
+                choices.append(choice)
+
+    return choices
+
+
+def clear_caches() -> None:
+    search_locales.cache_clear()
+    locale_choices.cache_clear()
+
+
+async def measure(
+    fn: Callable[[Any, str], Coroutine[Any, Any, list[Choice[str]]]], interaction: Any, number: int, cold: bool
+) -> float:
+    """Mean microseconds per call over all queries."""
+    elapsed = 0.0
+    for _ in range(number):
+        for query in QUERIES:
+            if cold:
+                clear_caches()
+            start = time.perf_counter()
+            await fn(interaction, query)
+            elapsed += time.perf_counter() - start
+    return elapsed / (number * len(QUERIES)) * 1e6
+
+
+async def run(args: argparse.Namespace) -> None:
+    interaction = SimpleNamespace(locale=DiscordLocale.japanese, user=SimpleNamespace(id=1))
+    transformer = LocaleStringTransformer()
+    await transformer.transform(interaction, 'DE')  # type: ignore[arg-type]
+    current = transformer.autocomplete
+
+    for query in ('ger', 'japnese', '日本'):
+        names = [choice.name for choice in await current(interaction, query)]  # type: ignore[arg-type]
+        print(f'{query!r}: {names}')
+
+    for name, fn, cold in (
+        ('previous', previous_autocomplete, False),
+        ('index, cold', current, True),
+        ('index, warm', current, False),
+    ):
+        best = min([await measure(fn, interaction, 200, cold) for _ in range(args.repeat)])  # type: ignore[arg-type]
+        print(f'{name:>12}: {best:7.1f}us per call')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='benchmark of the locale autocomplete.')
+    parser.add_argument('--repeat', type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Memory benchmark of the gateway profiles of lib.gateway.GatewayProfile.
+
+usage: python -m scripts.bench_gateway_memory [--guilds 1000] [--channels 20] [--members 20] [--messages 50]
+
+Each profile runs in its own process. The client is fed the events a gateway connection with the profile's intents
+would deliver for a synthetic number of guilds (READY listing every guild as unavailable, then GUILD_CREATE and
+MESSAGE_CREATE in every channel), and RSS is reported before and after. No connection to Discord is made.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import resource
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import discord
+
+from lib.gateway import GatewayProfile
+
+PROFILES = {'default': GatewayProfile.default, 'minimal': GatewayProfile.minimal}
+
+
+def rss_mib() -> float:
+    """Current RSS, or the peak where /proc is not available."""
+    try:
+        pages = int(Path('/proc/self/statm').read_text().split()[1])
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return pages * resource.getpagesize() / 2**20
+
+
+def user(user_id: int) -> dict[str, Any]:
+    return {'id': str(user_id), 'username': f'user{user_id}', 'discriminator': '0', 'avatar': None}
+
+
+def ready(args: argparse.Namespace) -> dict[str, Any]:
+    # sent whatever the intents. each guild is listed as unavailable until its GUILD_CREATE.
+    return {
+        'v': 10,
+        'user': {**user(1), 'bot': True},
+        'guilds': [{'id': str(g), 'unavailable': True} for g in range(1, args.guilds + 1)],
+        'session_id': 'session',
+        'resume_gateway_url': 'wss://gateway.discord.gg',
+        'application': {'id': '1', 'flags': 0},
+    }
+
+
+def guild(guild_id: int, args: argparse.Namespace) -> dict[str, Any]:
+    channels: list[dict[str, Any]] = [
+        {'id': str(guild_id * 1000 + i), 'type': 0, 'name': f'channel-{i}', 'position': i, 'permission_overwrites': []}
+        for i in range(args.channels)
+    ]
+    members: list[dict[str, Any]] = [
+        {
+            'user': user(guild_id * 1000 + i),
+            'roles': [],
+            'joined_at': '2024-01-01T00:00:00+00:00',
+            'deaf': False,
+            'flags': 0,
+        }
+        for i in range(args.members)
+    ]
+    return {
+        'id': str(guild_id),
+        'name': f'guild-{guild_id}',
+        'owner_id': '1',
+        'roles': [{'id': str(guild_id), 'name': '@everyone', 'permissions': '0', 'position': 0, 'color': 0}],
+        'emojis': [],
+        'stickers': [],
+        'features': [],
+        'channels': channels,
+        'threads': [],
+        'members': members,
+        'member_count': args.members,
+        'voice_states': [],
+        'presences': [],
+        'large': False,
+    }
+
+
+def message(message_id: int, guild_id: int, channel_id: int, author_id: int) -> dict[str, Any]:
+    return {
+        'id': str(message_id),
+        'channel_id': str(channel_id),
+        'guild_id': str(guild_id),
+        'author': user(author_id),
+        'member': {'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'flags': 0},
+        'content': 'a message nobody reads ' * 4,
+        'timestamp': '2024-01-01T00:00:00+00:00',
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [],
+        'embeds': [{'title': 'embed', 'description': 'description ' * 8}],
+        'pinned': False,
+        'type': 0,
+    }
+
+
+async def feed(profile: GatewayProfile, args: argparse.Namespace) -> None:
+    client = discord.Client(**profile.options())
+    state = client._connection
+    intents = profile.intents
+    before = rss_mib()
+
+    state.parse_ready(ready(args))  # type: ignore[arg-type]
+    next_id = 10**12
+    for g in range(1, args.guilds + 1):
+        # without the guilds intent Discord sends no guild events at all.
+        if intents.guilds:
+            state.parse_guild_create(guild(g, args))  # type: ignore[arg-type]
+        if intents.guild_messages:
+            for m in range(args.messages):
+                next_id += 1
+                channel_id = g * 1000 + m % max(args.channels, 1)
+                author_id = g * 1000 + m % max(args.members, 1)
+                state.parse_message_create(message(next_id, g, channel_id, author_id))  # type: ignore[arg-type]
+    await asyncio.sleep(0)
+    gc.collect()
+    after = rss_mib()
+
+    cached = f'guilds={len(state._guilds)} messages={len(state._messages or ())}'
+    print(f'{args.run:>8}: rss before={before:7.1f}MiB after={after:7.1f}MiB growth={after - before:7.1f}MiB {cached}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='memory benchmark of the gateway profiles.')
+    parser.add_argument('--guilds', type=int, default=1000)
+    parser.add_argument('--channels', type=int, default=20, help='text channels per guild')
+    parser.add_argument('--members', type=int, default=20, help='members per guild in GUILD_CREATE')
+    parser.add_argument('--messages', type=int, default=50, help='messages per guild')
+    parser.add_argument('--run', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run is not None:
+        asyncio.run(feed(PROFILES[args.run](), args))
+        return
+
+    print(f'guilds={args.guilds} channels={args.channels} members={args.members} messages={args.messages}')
+    for profile in PROFILES:
+        subprocess.run(
+            [sys.executable, '-m', 'scripts.bench_gateway_memory', *sys.argv[1:], '--run', profile], check=True
+        )
+
+
+if __name__ == '__main__':
+    main()
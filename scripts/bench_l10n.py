@@ -0,0 +1,90 @@
+"""Micro-benchmark of rendering the strings of one response.
+
+usage: python -m scripts.bench_l10n [--repeat 5]
+
+Compares lib.localization.render (one lookup per string in the compiled catalog) with the previous path: an awaited
+Interaction.translate per string, going through localize_key and the nested l10n.toml dicts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import tomllib
+from types import SimpleNamespace
+from typing import Any
+
+from discord import Locale
+from discord.app_commands import locale_str
+
+from lib.localization import (
+    L10N_PATH,
+    MSG_KEY_API_FREE,
+    MSG_NOT_SET,
+    MSG_SETTING_SHOW_PLACEHOLDER,
+    catalog,
+    localize_key,
+    render,
+)
+
+STRINGS = (MSG_KEY_API_FREE, MSG_NOT_SET, MSG_SETTING_SHOW_PLACEHOLDER)
+
+
+class PreviousTranslator:
+    """The DiscordTranslator.translate the catalog replaced, kept for comparison."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, dict[str, str]] = tomllib.loads(L10N_PATH.read_text())
+
+    async def translate(self, string: locale_str, locale: Locale, context: Any) -> str | None:
+        return (
+            self.data.get(locale.value, {}).get(localize_key[string]) if string in localize_key else None
+        ) or string.message
+
+
+def previous_interaction(translator: PreviousTranslator, locale: Locale) -> SimpleNamespace:
+    async def translate(string: str | locale_str) -> str | None:
+        # what discord.Interaction.translate does before calling the translator.
+        if not isinstance(string, locale_str):
+            string = locale_str(string)
+        return await translator.translate(string, locale, None)
+
+    return SimpleNamespace(locale=locale, translate=translate)
+
+
+async def previous(interaction: Any) -> list[str]:
+    return [await interaction.translate(string) for string in STRINGS]
+
+
+async def current(interaction: Any) -> list[str]:
+    return render(interaction, *STRINGS)
+
+
+async def measure(fn: Any, interaction: Any, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await fn(interaction)
+    return (time.perf_counter() - start) / number * 1e6
+
+
+async def run(args: argparse.Namespace) -> None:
+    catalog.load(L10N_PATH)
+    number = 20000
+    for locale in (Locale.japanese, Locale.french):
+        old = previous_interaction(PreviousTranslator(), locale)
+        new = SimpleNamespace(locale=locale)
+        assert await previous(old) == await current(new)
+        for name, fn, interaction in (('previous', previous, old), ('catalog', current, new)):
+            best = min([await measure(fn, interaction, number) for _ in range(args.repeat)])
+            print(f'{locale.value:>5} {name:>9}: {best:6.2f}us per response ({len(STRINGS)} strings)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='benchmark of localized string rendering.')
+    parser.add_argument('--repeat', type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
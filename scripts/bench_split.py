@@ -0,0 +1,83 @@
+"""Micro-benchmark of splitting long messages into 2000 character chunks.
+
+usage: python -m scripts.bench_split [--repeat 5]
+
+Compares lib.string_pair.split_message with the previous split_line on markdown inputs from 4 KB to 1 MB.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from typing import TYPE_CHECKING
+
+from lib.string_pair import split_message
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+SIZES = (4 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024)
+PARTS = (
+    'Die Wartungsarbeiten beginnen morgen um 10 Uhr und dauern voraussichtlich zwei Stunden. ',
+    'Bitte lest die Patchnotes sorgfältig durch! ',
+    'https://example.com/patch-notes/2024/very/long/path?with=query&and=more ',
+    '\n',
+    '\n\n',
+    '\n```py\nfor i in range(10):\n    print(i)\n```\n',
+    '👨‍👩‍👧‍👦 🇯🇵 👍🏽 ',
+    '日本語の文章も含まれます。',
+)
+
+
+def split_line(string: str, num: int) -> Iterable[str]:
+    """The implementation split_message replaced, kept for comparison."""
+    string, num = str(string), int(num)
+    while True:
+        if len(string) <= num:
+            yield string
+            return
+        str1, str2 = string[:num], string[num:]
+        str1_split = str1.splitlines(keepends=True)
+        if len(str1_split) > 1:
+            str1, str2 = ''.join(str1_split[:-1]), str1_split[-1] + str2
+        yield str1
+        string = str2
+
+
+def make_input(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    total = 0
+    while total < size:
+        part = rng.choice(PARTS)
+        parts.append(part)
+        total += len(part)
+    return ''.join(parts)[:size]
+
+
+def bench(fn: Callable[[str, int], Iterable[str]], string: str, repeat: int) -> float:
+    number = max(1, 2_000_000 // len(string))
+    return min(timeit.repeat(lambda: list(fn(string, 2000)), number=number, repeat=repeat)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='benchmark of message splitting.')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"size":>8} {"split_line":>12} {"split_message":>14} {"chunks":>7} {"MB/s":>8}')
+    for size in SIZES:
+        string = make_input(size)
+        old = bench(split_line, string, args.repeat)
+        new = bench(split_message, string, args.repeat)
+        chunks = list(split_message(string, 2000))
+        assert all(len(chunk) <= 2000 for chunk in chunks)
+        print(
+            f'{size // 1024:>6}KB {old * 1000:>10.3f}ms {new * 1000:>12.3f}ms {len(chunks):>7} '
+            f'{size / new / 1024 / 1024:>8.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
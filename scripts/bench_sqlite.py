@@ -0,0 +1,110 @@
+"""Benchmark of the SQLite layer under a burst of concurrent user info reads and locale updates.
+
+usage: python -m scripts.bench_sqlite [--users 1000] [--tasks 50] [--operations 200] [--write-ratio 0.2]
+
+Compares the previous setup (default synchronous=FULL, commit after every session, read then REPLACE to change
+the target locale) with lib.db.SqliteProfile, read-only sessions and single-statement upserts. The user info cache of
+lib.client.Client is bypassed so that every operation reaches SQLite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from asqlite import create_pool
+
+from lib.db import DBClient, SqliteProfile, UserInfo
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from asqlite import Pool
+
+    from lib.locale import LocaleString
+
+LOCALES: tuple[LocaleString, ...] = ('DE', 'EN-US', 'FR', 'JA', 'KO', 'ZH')
+
+
+class PreviousDBClient(DBClient):
+    """The session DBClient used before read-only sessions: autocommit, then commit on exit, kept for comparison."""
+
+    async def __aenter__(self) -> Self:
+        self.conn = await self.ctx.__aenter__()
+        return self
+
+    async def __aexit__(self, et: type[BaseException] | None, ev: BaseException | None, eb: TracebackType | None):
+        await self.conn.commit()
+        return await self.ctx.__aexit__(et, ev, eb)
+
+
+async def previous(pool: Pool, user_id: int, write: bool, locale: LocaleString) -> None:
+    async with PreviousDBClient(None, pool.acquire()) as db:  # type: ignore[arg-type]
+        user_info = await db.get_user_info(user_id)
+    if write:
+        async with PreviousDBClient(None, pool.acquire()) as db:  # type: ignore[arg-type]
+            await db.update_user_info(user_info._replace(target_locale=locale))
+
+
+async def current(pool: Pool, user_id: int, write: bool, locale: LocaleString) -> None:
+    if write:
+        async with DBClient(None, pool.acquire()) as db:  # type: ignore[arg-type]
+            await db.update_user_field(user_id, 'target_locale', locale)
+    else:
+        async with DBClient(None, pool.acquire(), readonly=True) as db:  # type: ignore[arg-type]
+            await db.get_user_info(user_id)
+
+
+async def run(name: str, operation: Any, init: Any, args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        async with create_pool(str(Path(tmp) / 'db.sqlite3'), init=init) as pool:
+            async with DBClient(None, pool.acquire()) as db:  # type: ignore[arg-type]
+                await db.create_table()
+                for user_id in range(args.users):
+                    await db.update_user_info(UserInfo(user_id, f'key-{user_id}:fx', 'DE'))
+
+            rng = random.Random(args.seed)
+            plans: list[list[tuple[int, bool, LocaleString]]] = [
+                [
+                    (rng.randrange(args.users), rng.random() < args.write_ratio, rng.choice(LOCALES))
+                    for _ in range(args.operations)
+                ]
+                for _ in range(args.tasks)
+            ]
+
+            async def task(plan: list[tuple[int, bool, LocaleString]]) -> None:
+                for user_id, write, locale in plan:
+                    await operation(pool, user_id, write, locale)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(task(plan) for plan in plans))
+            elapsed = time.perf_counter() - start
+
+    total = args.tasks * args.operations
+    print(f'{name:>9}: {total} operations in {elapsed:6.2f}s, {total / elapsed:8.0f} ops/s')
+
+
+def use_synchronous_full(conn: Any) -> None:
+    conn.execute('PRAGMA synchronous = FULL')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='benchmark of the SQLite layer.')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--tasks', type=int, default=50, help='concurrent interactions')
+    parser.add_argument('--operations', type=int, default=200, help='operations per task')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(run('previous', previous, use_synchronous_full, args))
+    asyncio.run(run('current', current, SqliteProfile().apply, args))
+
+
+if __name__ == '__main__':
+    main()
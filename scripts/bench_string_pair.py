@@ -0,0 +1,113 @@
+"""Micro-benchmark of StringPair.encode and apply on embed-heavy bot messages.
+
+usage: python -m scripts.bench_string_pair [--embeds 10] [--fields 25] [--repeat 5]
+
+Compares lib.string_pair.StringPair with the previous dotted string key implementation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from functools import partial
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, cast
+
+from discord import Embed, Message
+
+from lib.string_pair import StringPair
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+
+class DottedStringPair:
+    """The encode/apply StringPair used before segment paths, kept for comparison (without content splitting)."""
+
+    def __init__(self, msg: Any):
+        self.msg = msg
+
+    def encode(self) -> Generator[tuple[str, str], Any, Any]:
+        if self.msg.content:
+            yield ('content', self.msg.content)
+        for i, e in enumerate(self.msg.embeds):
+            if e.title:
+                yield (f'embed.{i}.title', e.title)
+            if e.description:
+                yield (f'embed.{i}.description', e.description)
+            for j, f in enumerate(e.fields):
+                if f.name:
+                    yield (f'embed.{i}.fields.{j}.name', f.name)
+                if f.value:
+                    yield (f'embed.{i}.fields.{j}.value', f.value)
+            if e.footer and e.footer.text:
+                yield (f'embed.{i}.footer', e.footer.text)
+
+    def apply(self, pair: tuple[tuple[str, str], ...]) -> tuple[str | None, list[Embed]]:
+        content: str | None = None
+        embeds: list[Embed] = [Embed.from_dict(e.to_dict()) for e in self.msg.embeds]
+        for k, v in pair:
+            if k == 'content':
+                content = v
+                continue
+            ks = k.split('.')
+            i = int(ks[1])
+            while len(embeds) <= i:
+                embeds.append(Embed())
+            if ks[2] == 'title':
+                embeds[i].title = v
+            elif ks[2] == 'description':
+                embeds[i].description = v
+            elif ks[2] == 'fields':
+                j = int(ks[3])
+                while len(embeds[i].fields) <= j:
+                    embeds[i].add_field(name='', value='')
+                if ks[4] == 'name':
+                    embeds[i].fields[j].name = v
+                else:
+                    embeds[i].fields[j].value = v
+            elif ks[2] == 'footer':
+                embeds[i].set_footer(text=v)
+        return content, embeds
+
+
+def make_message(embeds: int, fields: int) -> Message:
+    message_embeds: list[Embed] = []
+    for i in range(embeds):
+        embed = Embed(title=f'Order #{i}', description='Your order has been shipped and will arrive soon.')
+        for j in range(fields):
+            embed.add_field(name=('Status', 'Price', 'Date')[j % 3], value=f'value {i}-{j}')
+        embed.set_footer(text='Powered by some bot')
+        message_embeds.append(embed)
+    # only content and embeds are read.
+    return cast('Message', SimpleNamespace(content='Here is your weekly summary.', embeds=message_embeds))
+
+
+def encode(cls: Any, message: Message) -> None:
+    list(cls(message).encode())
+
+
+def round_trip(cls: Any, message: Message) -> None:
+    pair = cls(message)
+    pair.apply(tuple((k, v) for k, v in pair.encode()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='benchmark of StringPair encode/apply.')
+    parser.add_argument('--embeds', type=int, default=10)
+    parser.add_argument('--fields', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    message = make_message(args.embeds, args.fields)
+    segments = sum(1 for _ in StringPair(message).encode())
+    print(f'{args.embeds} embeds x {args.fields} fields, {segments} segments')
+    for name, cls in (('dotted keys', DottedStringPair), ('segment paths', StringPair)):
+        number = 200
+        encoded = min(timeit.repeat(partial(encode, cls, message), number=number, repeat=args.repeat)) / number
+        total = min(timeit.repeat(partial(round_trip, cls, message), number=number, repeat=args.repeat)) / number
+        print(f'{name:>14}: encode {encoded * 1e6:8.1f}us  encode+apply {total * 1e6:8.1f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Local stand-in for DeepL /v2/translate and /v2/usage.
+
+usage: python -m scripts.fake_deepl --port 8080 --latency 0.3 --jitter 0.1 --error 429=0.05 --error 503=0.01
+
+Translations are deterministic: `[<target_lang>] <text>`.
+Point the bot at it with DEEPL_API_URL / DEEPL_FREE_API_URL=http://127.0.0.1:8080.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+
+from lib.placeholder import billed_length
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+class FakeDeepL:
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        errors: dict[int, float] | None = None,
+        character_limit: int = 500_000,
+        retry_after: float | None = None,
+        seed: int | None = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.errors = errors or {}
+        self.character_limit = character_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.character_count: defaultdict[str, int] = defaultdict(int)
+        self.requests: defaultdict[str, int] = defaultdict(int)
+        self.statuses: defaultdict[int, int] = defaultdict(int)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/v2/translate', self.translate)
+        app.router.add_get('/v2/usage', self.usage)
+        app.router.add_route('HEAD', '/', self.head)
+        return app
+
+    @staticmethod
+    def translate_text(text: str, target_lang: str) -> str:
+        return f'[{target_lang}] {text}'
+
+    async def delay(self) -> None:
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    def auth_key(self, request: web.Request) -> str | None:
+        auth = request.headers.get('Authorization', '')
+        return auth.removeprefix('DeepL-Auth-Key ') if auth.startswith('DeepL-Auth-Key ') else None
+
+    def injected_error(self) -> web.Response | None:
+        roll = self.random.random()
+        for status, rate in self.errors.items():
+            if roll < rate:
+                headers = {'Retry-After': str(self.retry_after)} if status == 429 and self.retry_after else {}
+                return self.respond(web.Response(status=status, headers=headers))
+            roll -= rate
+        return None
+
+    def respond(self, response: web.Response) -> web.Response:
+        self.statuses[response.status] += 1
+        return response
+
+    async def head(self, request: web.Request) -> web.Response:
+        return web.Response(status=404)
+
+    async def translate(self, request: web.Request) -> web.Response:
+        self.requests['translate'] += 1
+        await self.delay()
+        if (key := self.auth_key(request)) is None:
+            return self.respond(web.Response(status=403))
+        if error := self.injected_error():
+            return error
+
+        if request.content_type == 'application/json':
+            body = await request.json()
+            texts: Sequence[str] = body.get('text', [])
+            target_lang: str = body.get('target_lang', '')
+            tag_handling: str = body.get('tag_handling', '')
+        else:
+            data = await request.post()
+            texts = [str(v) for v in data.getall('text', [])] or request.query.getall('text', [])
+            target_lang = str(data.get('target_lang') or request.query.get('target_lang', ''))
+            tag_handling = str(data.get('tag_handling') or request.query.get('tag_handling', ''))
+        if not texts or not target_lang:
+            return self.respond(web.Response(status=400))
+
+        # like DeepL, tags are not billed.
+        characters = sum(map(billed_length if tag_handling == 'xml' else len, texts))
+        if self.character_count[key] + characters > self.character_limit:
+            return self.respond(web.Response(status=456))
+        self.character_count[key] += characters
+
+        return self.respond(
+            web.json_response(
+                {
+                    'translations': [
+                        {'detected_source_language': 'EN', 'text': self.translate_text(text, target_lang)}
+                        for text in texts
+                    ]
+                }
+            )
+        )
+
+    async def usage(self, request: web.Request) -> web.Response:
+        self.requests['usage'] += 1
+        await self.delay()
+        if (key := self.auth_key(request)) is None:
+            return self.respond(web.Response(status=403))
+        if error := self.injected_error():
+            return error
+        return self.respond(
+            web.json_response({'character_count': self.character_count[key], 'character_limit': self.character_limit})
+        )
+
+
+def parse_error(value: str) -> tuple[int, float]:
+    status, rate = value.split('=')
+    return int(status), float(rate)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='local stand-in for DeepL API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='base latency of each response in seconds.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='uniform jitter added to latency in seconds.')
+    parser.add_argument(
+        '--error', type=parse_error, action='append', default=[], help='STATUS=RATE, e.g. 429=0.05. repeatable.'
+    )
+    parser.add_argument('--retry-after', type=float, default=None, help='Retry-After sent with injected 429.')
+    parser.add_argument('--character-limit', type=int, default=500_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    fake = FakeDeepL(
+        latency=args.latency,
+        jitter=args.jitter,
+        errors=dict(args.error),
+        character_limit=args.character_limit,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    web.run_app(fake.app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
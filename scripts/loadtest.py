@@ -0,0 +1,252 @@
+"""End-to-end load test of the Translator cog against a local DeepL stand-in.
+
+usage: python -m scripts.loadtest --users 50 --requests 20 --latency 0.3 --error 429=0.05
+
+Drives the translate context menu and /usage handlers with synthetic Interaction and Message objects.
+No Discord connection and no DeepL key is needed. Reports throughput and p50/p95/p99 latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import web
+from asqlite import create_pool
+from discord import Embed, Locale
+
+from lib import Client, Translator
+from lib.db import UserInfo
+from lib.localization import (
+    MSG_403,
+    MSG_429,
+    MSG_456,
+    MSG_500_OR_MORE,
+    MSG_NEED_KEY,
+    MSG_NEED_KEY_AND_LOCALE,
+    MSG_NEED_LOCALE,
+    MSG_UNKNOWN_STATUS,
+    catalog,
+)
+from scripts.fake_deepl import FakeDeepL, parse_error
+
+WORDS = [
+    'the',
+    'quick',
+    'brown',
+    'fox',
+    'jumps',
+    'over',
+    'lazy',
+    'dog',
+    'server',
+    'update',
+    'release',
+    'patch',
+    'notes',
+    'event',
+    'reward',
+    'weekly',
+    'maintenance',
+    'schedule',
+    'please',
+    'check',
+    'channel',
+    'announcement',
+    'today',
+    'tomorrow',
+    'member',
+    'role',
+    'price',
+    'status',
+]
+
+# the messages of UnexpectedCondition, which the cog sends instead of a translation.
+ERROR_MESSAGES = (
+    MSG_NEED_KEY,
+    MSG_NEED_LOCALE,
+    MSG_NEED_KEY_AND_LOCALE,
+    MSG_403,
+    MSG_456,
+    MSG_429,
+    MSG_500_OR_MORE,
+    MSG_UNKNOWN_STATUS,
+)
+
+
+class FakeResponse:
+    def __init__(self, interaction: FakeInteraction) -> None:
+        self.interaction = interaction
+
+    async def defer(self, *, ephemeral: bool = False, thinking: bool = False) -> None:
+        await asyncio.sleep(self.interaction.discord_latency)
+
+    async def send_message(self, content: str | None = None, **kwargs: Any) -> None:
+        await self.interaction.sent(content)
+
+
+class FakeFollowup:
+    def __init__(self, interaction: FakeInteraction) -> None:
+        self.interaction = interaction
+
+    async def send(self, content: str | None = None, **kwargs: Any) -> None:
+        await self.interaction.sent(content)
+
+
+class FakeInteraction:
+    ids = itertools.count(1)
+
+    def __init__(self, user_id: int, discord_latency: float) -> None:
+        self.id = next(self.ids)
+        self.user = SimpleNamespace(id=user_id)
+        self.context = SimpleNamespace(dm_channel=False)
+        self.locale = Locale.american_english
+        self.discord_latency = discord_latency
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.started = time.perf_counter()
+        self.first_sent: float | None = None
+        self.messages: list[str | None] = []
+        self.failed = False
+
+    async def sent(self, content: str | None) -> None:
+        await asyncio.sleep(self.discord_latency)
+        if self.first_sent is None:
+            self.first_sent = time.perf_counter()
+        self.messages.append(content)
+        # errors are rendered in the interaction's locale like any other response.
+        if content in catalog.render(self.locale, *ERROR_MESSAGES):
+            self.failed = True
+
+
+def make_message(rng: random.Random, words: int, embeds: int, fields: int) -> SimpleNamespace:
+    def sentence(n: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize() + '.'
+
+    message_embeds: list[Embed] = []
+    for _ in range(embeds):
+        embed = Embed(title=sentence(4), description=sentence(20))
+        for _ in range(fields):
+            embed.add_field(name=rng.choice(('Status', 'Price', 'Date', 'Role')), value=sentence(6))
+        message_embeds.append(embed)
+    return SimpleNamespace(content=sentence(words), embeds=message_embeds)
+
+
+def percentiles(samples: list[float]) -> str:
+    if len(samples) < 2:
+        return 'n/a'
+    q = statistics.quantiles(samples, n=100, method='inclusive')
+    return f'p50={q[49] * 1000:8.1f}ms p95={q[94] * 1000:8.1f}ms p99={q[98] * 1000:8.1f}ms'
+
+
+async def run(args: argparse.Namespace) -> None:
+    fake = FakeDeepL(
+        latency=args.latency,
+        jitter=args.jitter,
+        errors=dict(args.error),
+        retry_after=args.retry_after,
+        character_limit=10**12,
+        seed=args.seed,
+    )
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', args.port)
+    await site.start()
+    os.environ['DEEPL_API_URL'] = os.environ['DEEPL_FREE_API_URL'] = f'http://127.0.0.1:{args.port}'
+
+    rng = random.Random(args.seed)
+    messages = [make_message(rng, args.words, args.embeds, args.fields) for _ in range(args.distinct_messages)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        async with create_pool(str(Path(tmp) / 'db.sqlite3')) as pool:
+            bot = SimpleNamespace(pool=pool)
+            client = Client(bot)  # type: ignore[arg-type]
+            async with client.db() as db:
+                await db.create_table()
+                for user_id in range(args.users):
+                    await db.update_user_info(UserInfo(user_id, f'fake-key-{user_id}:fx', args.locales))
+            await client.start()
+            cog = Translator(bot, client)  # type: ignore[arg-type]
+            translate = cog.translate_wrapper().callback
+
+            latencies: defaultdict[str, list[float]] = defaultdict(list)
+            first: list[float] = []
+            failures: defaultdict[str, int] = defaultdict(int)
+
+            async def user(user_id: int) -> None:
+                user_rng = random.Random(args.seed * 7919 + user_id)
+                for _ in range(args.requests):
+                    interaction = FakeInteraction(user_id, args.discord_latency)
+                    if user_rng.random() < args.usage_ratio:
+                        kind = 'usage'
+                        await usage_callback(cog, interaction)
+                    else:
+                        kind = 'translate'
+                        await translate(interaction, user_rng.choice(messages))  # type: ignore[arg-type]
+                    end = time.perf_counter()
+                    latencies[kind].append(end - interaction.started)
+                    if interaction.first_sent is not None and kind == 'translate':
+                        first.append(interaction.first_sent - interaction.started)
+                    if interaction.failed:
+                        failures[kind] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(user(i) for i in range(args.users)))
+            elapsed = time.perf_counter() - started
+            await client.close()
+
+    await runner.cleanup()
+
+    total = sum(len(v) for v in latencies.values())
+    print(f'users={args.users} requests/user={args.requests} elapsed={elapsed:.2f}s throughput={total / elapsed:.1f}/s')
+    for kind, samples in sorted(latencies.items()):
+        print(f'{kind:>10}: n={len(samples):6d} errors={failures[kind]:5d} {percentiles(samples)}')
+    print(f'{"first msg":>10}: n={len(first):6d}              {percentiles(first)}')
+    print(f'DeepL stand-in: requests={dict(fake.requests)} statuses={dict(fake.statuses)}')
+    print(
+        f'client: coalesced={client.translate_flight.coalesced} '
+        f'deduplicated_characters={client.deduplicated_characters} '
+        f'same_language_characters={client.same_language_characters} '
+        f'user_info_hit_rate={client.user_info_cache.hit_rate:.2f} '
+        f'translation_cache_hit_rate={client.translation_cache.memory.hit_rate:.2f} '
+        f'connections created={client.transport_stats.created} reused={client.transport_stats.reused}'
+    )
+
+
+async def usage_callback(cog: Translator, interaction: FakeInteraction) -> None:
+    # the callback of a cog command takes the cog, mypy only sees the interaction.
+    await cog.usage.callback(cog, interaction)  # type: ignore[call-arg, arg-type]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='load test of the Translator cog against a local DeepL stand-in.')
+    parser.add_argument('--users', type=int, default=20, help='number of concurrent users.')
+    parser.add_argument('--requests', type=int, default=10, help='number of interactions per user.')
+    parser.add_argument('--usage-ratio', type=float, default=0.1, help='share of /usage among interactions.')
+    parser.add_argument('--distinct-messages', type=int, default=50, help='size of the message pool to pick from.')
+    parser.add_argument('--words', type=int, default=40, help='words in message content.')
+    parser.add_argument('--locales', default='DE', help='comma separated target locales of each user.')
+    parser.add_argument('--embeds', type=int, default=1, help='embeds per message.')
+    parser.add_argument('--fields', type=int, default=5, help='fields per embed.')
+    parser.add_argument('--latency', type=float, default=0.2, help='DeepL stand-in latency in seconds.')
+    parser.add_argument('--jitter', type=float, default=0.05, help='DeepL stand-in latency jitter in seconds.')
+    parser.add_argument('--discord-latency', type=float, default=0.05, help='latency of each Discord API call.')
+    parser.add_argument('--error', type=parse_error, action='append', default=[], help='STATUS=RATE. repeatable.')
+    parser.add_argument('--retry-after', type=float, default=None)
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
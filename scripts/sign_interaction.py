@@ -0,0 +1,65 @@
+"""Sign interaction payloads locally and send them to the HTTP interactions endpoint.
+
+usage: python -m scripts.sign_interaction keygen
+       python -m scripts.sign_interaction send --private-key HEX [--url URL] [payload.json]
+
+keygen prints a key pair. Start the bot with DISCORD_PUBLIC_KEY set to the public key and INTERACTIONS_PORT set, then
+send payloads signed with the private key the way Discord signs them. Without a payload file a PING is sent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from aiohttp import ClientSession
+from nacl.signing import SigningKey
+
+
+def keygen() -> None:
+    key = SigningKey.generate()
+    print(f'private key: {key.encode().hex()}')
+    print(f'DISCORD_PUBLIC_KEY={key.verify_key.encode().hex()}')
+
+
+def sign(private_key: str, body: bytes) -> dict[str, str]:
+    timestamp = str(int(time.time()))
+    signature = SigningKey(bytes.fromhex(private_key)).sign(timestamp.encode() + body).signature
+    return {
+        'Content-Type': 'application/json',
+        'X-Signature-Ed25519': signature.hex(),
+        'X-Signature-Timestamp': timestamp,
+    }
+
+
+async def send(url: str, private_key: str, payload: dict[str, object]) -> None:
+    body = json.dumps(payload).encode()
+    async with ClientSession() as session:
+        start = time.perf_counter()
+        async with session.post(url, data=body, headers=sign(private_key, body)) as resp:
+            text = await resp.text()
+        print(f'{resp.status} in {(time.perf_counter() - start) * 1000:.1f}ms: {text}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='sign interaction payloads for the HTTP interactions endpoint.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('keygen', help='print a new key pair.')
+    send_parser = sub.add_parser('send', help='sign and send a payload.')
+    send_parser.add_argument('--private-key', required=True)
+    send_parser.add_argument('--url', default='http://127.0.0.1:8080/interactions')
+    send_parser.add_argument('payload', nargs='?', type=Path, help='JSON file of the interaction. PING if omitted.')
+    args = parser.parse_args()
+
+    if args.command == 'keygen':
+        keygen()
+        return
+    payload: dict[str, object] = json.loads(args.payload.read_text()) if args.payload else {'id': '0', 'type': 1}
+    asyncio.run(send(args.url, args.private_key, payload))
+
+
+if __name__ == '__main__':
+    main()
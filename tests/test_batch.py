@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import pytest
+
+from lib.batch import plan_batches
+
+
+def test_batches_are_bounded_by_text_count() -> None:
+    texts = ['a'] * 7
+
+    assert plan_batches(texts, max_texts=3) == [slice(0, 3), slice(3, 6), slice(6, 7)]
+
+
+def test_batches_are_bounded_by_encoded_size() -> None:
+    # 2 bytes per character in UTF-8.
+    texts = ['é' * 3, 'é' * 3, 'é' * 3]
+
+    assert plan_batches(texts, max_bytes=12) == [slice(0, 2), slice(2, 3)]
+
+
+def test_oversized_text_is_sent_alone() -> None:
+    texts = ['a', 'b' * 100, 'c']
+
+    assert plan_batches(texts, max_bytes=10) == [slice(0, 1), slice(1, 2), slice(2, 3)]
+
+
+@pytest.mark.parametrize('count', [0, 1, 49, 50, 51, 500])
+def test_batches_cover_texts_in_order(count: int) -> None:
+    texts = [str(i) for i in range(count)]
+    batches = plan_batches(texts)
+
+    assert [text for batch in batches for text in texts[batch]] == texts
+    assert all(0 < batch.stop - batch.start <= 50 for batch in batches)
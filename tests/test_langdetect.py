@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+from lib.langdetect import detect_language, is_in_locale
+
+
+@pytest.mark.parametrize(
+    ('text', 'language'),
+    [
+        ('The project is open source and the community is very active, but there are not many developers.', 'EN'),
+        ('Das Projekt ist quelloffen und die Gemeinschaft ist sehr aktiv, aber es gibt nicht viele Entwickler.', 'DE'),
+        (
+            'Le projet est open source et la communauté est très active, mais il n’y a pas beaucoup de développeurs.',
+            'FR',
+        ),
+        ('El proyecto es de código abierto y la comunidad es muy activa, pero no hay muchos desarrolladores.', 'ES'),
+        ('O projeto é de código aberto e a comunidade é muito ativa, mas não há muitos desenvolvedores.', 'PT'),
+        (
+            (
+                'A projekt nyílt forráskódú, és a közösség nagyon aktív, mert sokan segítenek. '
+                'Ez nem csak egy hobbi, hanem már egy komoly munka, és még van mit tenni.'
+            ),
+            'HU',
+        ),
+        ('Этот проект с открытым исходным кодом, и сообщество очень активно, но разработчиков не так много.', 'RU'),
+        ('هذا المشروع مفتوح المصدر والمجتمع نشط جدا.', 'AR'),
+        ('このプロジェクトはオープンソースで、コミュニティはとても活発です。', 'JA'),
+    ],
+)
+def test_detects_language(text: str, language: str) -> None:
+    assert detect_language(text) == language
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        # Persian and Urdu are written in Arabic script.
+        'این پروژه متن باز است و جامعه آن بسیار فعال است.',
+        'یہ منصوبہ اوپن سورس ہے اور کمیونٹی بہت فعال ہے۔',
+        # Catalan and Galician share function words with Hungarian, Spanish and Portuguese.
+        'El projecte és de codi obert i la comunitat és molt activa.',
+        'Els ciutadans de Barcelona han votat a favor de la proposta, però encara no és clar què passarà.',
+        'O proxecto é de código aberto e a comunidade é moi activa.',
+        'Os veciños da vila están moi contentos porque a festa deste ano foi a mellor de todas.',
+        # Malay shares most function words with Indonesian.
+        'Projek ini adalah sumber terbuka dan komuniti sangat aktif kerana ramai orang boleh menyumbang.',
+        'Kerajaan telah mengumumkan bahawa sekolah akan dibuka semula minggu depan kerana keadaan sudah pulih.',
+        # Latin shares function words with French and Italian.
+        (
+            'Gallia est omnis divisa in partes tres, quarum unam incolunt Belgae, aliam Aquitani, tertiam qui ipsorum '
+            'lingua Celtae, nostra Galli appellantur.'
+        ),
+    ],
+)
+def test_neighbouring_languages_are_not_detected(text: str) -> None:
+    assert detect_language(text) is None
+
+
+def test_regional_languages_are_never_in_locale() -> None:
+    text = 'The project is open source and the community is very active, but there are not many developers.'
+
+    assert not is_in_locale(text, 'EN-US')
+    assert is_in_locale('Das Projekt ist quelloffen und die Gemeinschaft ist sehr aktiv, aber es gibt nichts.', 'DE')
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import pytest
+
+from lib.placeholder import billed_length, protect, restore
+
+
+@pytest.mark.parametrize(
+    ('text', 'spans'),
+    [
+        ('see https://example.com/a?b=1&c=2.', ('https://example.com/a?b=1&c=2',)),
+        ('no preview <https://example.com>', ('<https://example.com>',)),
+        ('hi <@123> and <@!456>, see <#789> with <@&1>', ('<@123>', '<@!456>', '<#789>', '<@&1>')),
+        ('nice <:blob:123> <a:party:456>', ('<:blob:123>', '<a:party:456>')),
+        ('run `uv sync` then\n```py\nx = 1 < 2\n```', ('`uv sync`', '```py\nx = 1 < 2\n```')),
+        ('try </translate:42> at <t:1700000000:R>', ('</translate:42>', '<t:1700000000:R>')),
+    ],
+)
+def test_protect_then_restore_round_trips(text: str, spans: tuple[str, ...]) -> None:
+    protected = protect(text)
+
+    assert protected.spans == spans
+    assert protected.translatable
+    assert not any(span in protected.text for span in spans)
+    assert restore(protected.text, protected.spans) == text
+
+
+def test_text_outside_placeholders_is_escaped() -> None:
+    protected = protect('a < b & c <@1>')
+
+    assert protected.text == 'a &lt; b &amp; c <x i="0"/>'
+    assert restore(protected.text, protected.spans) == 'a < b & c <@1>'
+    # DeepL bills the escaped characters once and the tags not at all.
+    assert billed_length(protected.text) == len('a < b & c ')
+
+
+def test_only_placeholders_is_not_translatable() -> None:
+    assert not protect('<@1> https://example.com `code`').translatable
+
+
+def test_restore_appends_dropped_spans() -> None:
+    assert restore('hallo', ('<@1>',)) == 'hallo <@1>'
+    assert restore('<x i="0"/> <x i="5"/>', ('<@1>',)) == '<@1> '
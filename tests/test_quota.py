@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from lib.quota import UsageTracker
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_exhausted_record_rejects_while_fresh(clock: list[float]) -> None:
+    usage = UsageTracker(ttl=300)
+    usage.set('key', {'character_count': 0, 'character_limit': 100})
+    usage.exhausted('key')
+
+    assert not usage.allows('key', 1)
+
+
+def test_exhausted_record_is_unknown_once_stale(clock: list[float]) -> None:
+    usage = UsageTracker(ttl=300)
+    usage.set('key', {'character_count': 0, 'character_limit': 100})
+    usage.exhausted('key')
+
+    clock[0] += 301
+    assert not usage.is_fresh(usage.get('key'))
+    # the quota may have been reset, DeepL decides until the record is refreshed.
+    assert usage.allows('key', 1)
+
+    usage.set('key', {'character_count': 0, 'character_limit': 100})
+    assert usage.allows('key', 100)
+    assert not usage.allows('key', 101)
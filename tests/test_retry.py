@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from email.utils import format_datetime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+from aiohttp import web
+from asqlite import create_pool
+
+from lib.client import Client, UnexpectedCondition
+from lib.localization import MSG_429
+from lib.retry import KeyBackoff, RetryPolicy, is_retryable, parse_retry_after
+from scripts.fake_deepl import FakeDeepL
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(('status', 'retryable'), [(429, True), (500, True), (503, True), (403, False), (456, False)])
+def test_is_retryable(status: int, retryable: bool) -> None:
+    assert is_retryable(status) is retryable
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('-1') == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+
+    date = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=30)
+    seconds = parse_retry_after(format_datetime(date, usegmt=True))
+    assert seconds is not None
+    assert 28 <= seconds <= 30
+
+
+def test_delay_prefers_retry_after_and_caps_backoff() -> None:
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+
+    assert policy.delay(1, '7') == 7.0
+    assert 0.5 <= policy.delay(1, None) <= 1.0
+    assert 2.0 <= policy.delay(10, None) <= 4.0
+
+
+def test_key_is_blocked_until_retry_after() -> None:
+    async def main() -> None:
+        backoff = KeyBackoff(RetryPolicy())
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        retry_at = backoff.failed('key', '5')
+        assert retry_at >= now + 5
+
+        # not usable before the deadline, so it gives up without waiting.
+        assert not await backoff.wait('key', now + 1)
+        assert loop.time() - now < 1
+        # other keys are not throttled.
+        assert await backoff.wait('other', now + 1)
+
+        backoff.succeeded('key')
+        assert await backoff.wait('key', now + 1)
+
+    asyncio.run(main())
+
+
+def test_wait_sleeps_until_the_key_is_usable() -> None:
+    async def main() -> None:
+        backoff = KeyBackoff(RetryPolicy())
+        loop = asyncio.get_running_loop()
+
+        retry_at = backoff.failed('key', '0.05')
+        assert await backoff.wait('key', retry_at + 1)
+        assert loop.time() >= retry_at
+
+    asyncio.run(main())
+
+
+def run_against(
+    fake: FakeDeepL, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fn: Callable[[Client], Awaitable[None]]
+) -> None:
+    async def main() -> None:
+        runner = web.AppRunner(fake.app())
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        monkeypatch.setenv('DEEPL_FREE_API_URL', f'http://127.0.0.1:{port}')
+        try:
+            async with create_pool(str(tmp_path / 'db.sqlite3')) as pool:
+                client = Client(SimpleNamespace(pool=pool))  # type: ignore[arg-type]
+                try:
+                    await fn(client)
+                finally:
+                    await client.close()
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(main())
+
+
+class FailFirst(FakeDeepL):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(errors={429: 1.0}, retry_after=retry_after)
+
+    def injected_error(self) -> web.Response | None:
+        error = super().injected_error()
+        self.errors = {}
+        return error
+
+
+def test_request_retries_after_retry_after(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = FailFirst(retry_after=0.05)
+
+    async def check(client: Client) -> None:
+        json = await client.request('key:fx', 'POST', '/v2/translate', body={'text': ['hi'], 'target_lang': 'DE'})
+        assert json['translations'][0]['text'] == '[DE] hi'
+
+    run_against(fake, tmp_path, monkeypatch, check)
+    assert fake.statuses == {429: 1, 200: 1}
+
+
+def test_request_gives_up_when_retry_after_is_past_the_deadline(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fake = FakeDeepL(errors={429: 1.0}, retry_after=60)
+
+    async def check(client: Client) -> None:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with pytest.raises(UnexpectedCondition) as e:
+            await client.request('key:fx', 'POST', '/v2/translate', body={'text': ['hi'], 'target_lang': 'DE'})
+        assert e.value.msg == MSG_429
+        assert loop.time() - start < 1
+
+    run_against(fake, tmp_path, monkeypatch, check)
+    assert fake.statuses == {429: 1}
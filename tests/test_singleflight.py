@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from lib.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call() -> None:
+    async def main() -> None:
+        flight: SingleFlight[str, int] = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def fn() -> int:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return 42
+
+        tasks = [asyncio.create_task(flight.do('key', fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [42, 42, 42]
+        assert calls == 1
+        assert flight.coalesced == 2
+        assert not flight.calls
+
+    asyncio.run(main())
+
+
+def test_leader_failure_reaches_every_caller_and_is_not_kept() -> None:
+    async def main() -> None:
+        flight: SingleFlight[str, int] = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def fail() -> int:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            raise ValueError(calls)
+
+        tasks = [asyncio.create_task(flight.do('key', fail)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert [type(r) for r in results] == [ValueError, ValueError]
+        assert calls == 1
+
+        # the failure is not cached, the next caller runs the call again.
+        with pytest.raises(ValueError, match='2'):
+            await flight.do('key', fail)
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_the_call() -> None:
+    async def main() -> None:
+        flight: SingleFlight[str, int] = SingleFlight()
+        release = asyncio.Event()
+
+        async def fn() -> int:
+            await release.wait()
+            return 1
+
+        leader = asyncio.create_task(flight.do('key', fn))
+        follower = asyncio.create_task(flight.do('key', fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == 1
+        assert leader.cancelled()
+
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from itertools import islice
+
+import pytest
+
+from lib.string_pair import CONTENT, FIELD_VALUE, TITLE, SegmentPath, deduplicate, split_message
+
+
+@pytest.mark.parametrize(
+    'string',
+    [
+        '`' * 1995 + ' word word',
+        '`' * 1990 + 'x' * 3000,
+        '```python\n' + 'x = 1\n' * 1000,
+    ],
+)
+def test_split_message_keeps_chunks_within_limit(string: str) -> None:
+    chunks = list(islice(split_message(string, 2000), 100))
+
+    assert len(chunks) < 100
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+
+
+@pytest.mark.parametrize('limit', [1, 5, 20, 50, 100])
+def test_split_message_advances_with_small_limits(limit: int) -> None:
+    string = '```cpp\n' + 'int x;\n```\n' * 40 + '`' * 30 + ' word'
+    chunks = list(islice(split_message(string, limit), 10_000))
+
+    assert len(chunks) < 10_000
+    assert all(len(chunk) <= limit for chunk in chunks)
+
+
+def test_deduplicate_collapses_identical_texts() -> None:
+    segments = [
+        (SegmentPath(CONTENT), 'hello'),
+        (SegmentPath(TITLE, 0), 'world'),
+        (SegmentPath(FIELD_VALUE, 0, 0), 'hello'),
+        (SegmentPath(FIELD_VALUE, 1, 0), 'hello'),
+    ]
+    unique = deduplicate(segments)
+
+    assert unique.texts == ['hello', 'world']
+    assert unique.paths == [path for path, _ in segments]
+    assert [unique.texts[i] for i in unique.indexes] == [text for _, text in segments]
+    assert unique.saved_characters == 2 * len('hello')
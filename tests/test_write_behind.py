@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from asqlite import create_pool
+
+from lib.db import DBClient, UserInfo
+from lib.write_behind import UserWriteBehind
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from pathlib import Path
+
+    from asqlite import Pool
+
+
+def run_with_pool(tmp_path: Path, fn: Callable[[Pool], Awaitable[None]]) -> None:
+    async def main() -> None:
+        async with create_pool(str(tmp_path / 'db.sqlite3')) as pool:
+            async with DBClient(None, pool.acquire()) as db:  # type: ignore[arg-type]
+                await db.create_table()
+            await fn(pool)
+
+    asyncio.run(main())
+
+
+async def stored(pool: Pool, user_id: int) -> UserInfo:
+    async with DBClient(None, pool.acquire(), readonly=True) as db:  # type: ignore[arg-type]
+        return await db.get_user_info(user_id)
+
+
+def test_close_flushes_pending_updates(tmp_path: Path) -> None:
+    async def check(pool: Pool) -> None:
+        writes = UserWriteBehind(lambda: DBClient(None, pool.acquire()), delay=60, max_batch=256)  # type: ignore[arg-type]
+        writes.put(1, {'key': 'key:fx'})
+        writes.put(1, {'target_locale': 'DE'})
+        writes.put(2, {'target_locale': 'JA'})
+
+        # not written yet, but served to readers.
+        assert await stored(pool, 1) == UserInfo(1, None, None)
+        assert writes.apply(UserInfo(1, None, None)) == UserInfo(1, 'key:fx', 'DE')
+
+        async with asyncio.timeout(5):
+            await writes.close()
+
+        assert await stored(pool, 1) == UserInfo(1, 'key:fx', 'DE')
+        assert await stored(pool, 2) == UserInfo(2, None, 'JA')
+        assert 1 not in writes
+        assert writes.flushes == 1
+
+    run_with_pool(tmp_path, check)
+
+
+def test_full_batch_is_written_before_the_delay(tmp_path: Path) -> None:
+    async def check(pool: Pool) -> None:
+        writes = UserWriteBehind(lambda: DBClient(None, pool.acquire()), delay=60, max_batch=2)  # type: ignore[arg-type]
+        writes.put(1, {'target_locale': 'DE'})
+        writes.put(2, {'target_locale': 'FR'})
+
+        async with asyncio.timeout(5):
+            while writes.flushes == 0:
+                await asyncio.sleep(0.01)
+
+        assert await stored(pool, 2) == UserInfo(2, None, 'FR')
+        await writes.close()
+
+    run_with_pool(tmp_path, check)